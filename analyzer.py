@@ -1,125 +1,43 @@
-import ast
-
-from detectors.agent_smells_detector import AgentSmellsDetector
-from detectors.checkpoint_smells_detector import CheckpointSmellsDetector
-from detectors.environment_smells_detector import EnvironmentSmellsDetector
-from detectors.evaluation_smells_detector import EvaluationSmellsDetector
-from detectors.hyperaparmeters_smells_detector import HyperparametersSmellsDetector
-from detectors.initialization_smells_detector import InitializationSmellsDetector
-from detectors.logging_detector import LoggingDetector
-from detectors.training_smells_detector import TrainEvalCouplingDetector
-
-
-class Analyzer(ast.NodeVisitor):
-    def __init__(self):
-        self.environment_smells = EnvironmentSmellsDetector()
-        self.checkpoint_smells = CheckpointSmellsDetector()
-        self.hyperparameter_smells = HyperparametersSmellsDetector()
-        self.evaluation_smells = EvaluationSmellsDetector()
-        self.logging_smells = LoggingDetector()
-        self.initialization_smells = InitializationSmellsDetector()
-        self.agent_smells = AgentSmellsDetector()
-        self.training_smells = TrainEvalCouplingDetector()
+from detectors.name_resolver import NameResolver
+from detectors.registry import detector_specs
+from profiler import profile_dispatch
+from project_index import SymbolCollector
+from traversal import ScopeStack, TraversalEngine
+
+
+class Analyzer:
+    # detectors: names from detectors.registry.select_detectors, None runs all of
+    # them; the modules of unselected detectors are never imported. index collects the
+    # file's symbols for the project index even when no selected detector reports to it.
+    def __init__(self, handler_stats=None, detectors=None, index=False):
+        self.specs = detector_specs(detectors)
+        self.names = NameResolver()
+        self.scope = ScopeStack()
+        # what the file adds to the project index, when a selected detector feeds it
+        uses_symbols = index or any("symbols" in spec.needs for spec in self.specs)
+        self.symbols = SymbolCollector(self.names, self.scope) if uses_symbols else None
+        shared = {"names": self.names, "scope": self.scope, "symbols": self.symbols}
+        self.detectors = [spec.load()(*(shared[need] for need in spec.needs)) for spec in self.specs]
+        # the resolver goes first so imports are known before detectors see the calls,
+        # then the collector so a function is known before detectors report from it;
+        # both are left out when no selected detector reads them
+        uses_names = uses_symbols or any("names" in spec.needs for spec in self.specs)
+        helpers = ([self.names] if uses_names else []) + ([self.symbols] if uses_symbols else [])
+        self.engine = TraversalEngine(helpers + self.detectors, scope=self.scope)
+        if handler_stats is not None:
+            # opt-in profiling, see profiler.profile_dispatch
+            self.engine.dispatch = profile_dispatch(self.engine.dispatch, handler_stats)
         self.report = []
 
-    def visit_Assign(self, node):
-        self.hyperparameter_smells.visit_Assign(node)
-        self.evaluation_smells.visit_Assign(node)
-        self.environment_smells.visit_Assign(node)
-        self.initialization_smells.visit_Assign(node)
-        self.generic_visit(node)
-
-    def visit_Call(self, node):
-        self.checkpoint_smells.visit_Call(node)
-        self.hyperparameter_smells.visit_Call(node)
-        self.evaluation_smells.visit_Call(node)
-        self.environment_smells.visit_Call(node)
-        self.logging_smells.visit_Call(node)
-        self.agent_smells.visit_Call(node)
-        self.training_smells.visit_Call(node)
-        self.generic_visit(node)
-
-    def visit_Import(self, node):
-        self.logging_smells.visit_Import(node)
-        self.hyperparameter_smells.visit_Import(node)
-        self.generic_visit(node)
-
-    def visit_ImportFrom(self, node):
-        self.logging_smells.visit_ImportFrom(node)
-        self.hyperparameter_smells.visit_ImportFrom(node)
-        self.generic_visit(node)
-
-    def visit_Expr(self, node):
-        self.environment_smells.visit_Expr(node)
-        self.generic_visit(node)
-
-    def visit_For(self, node):
-        self.checkpoint_smells.visit_For(node)
-        self.generic_visit(node)
-
-    def visit_While(self, node):
-        self.checkpoint_smells.visit_While(node)
-        self.generic_visit(node)
-
-    def visit_If(self, node):
-        self.initialization_smells.visit_If(node)
-        self.generic_visit(node)
-
-    def visit_FunctionDef(self, node):
-        self.training_smells.visit_FunctionDef(node)
-        self.generic_visit(node)
-
-    def visit_arguments(self, node):
-        self.training_smells.visit_arguments(node)
-        self.generic_visit(node)
+    def visit(self, tree):
+        self.engine.run(tree)
 
     def get_report(self):
-        self.get_env_smells_report()
-        self.get_checkpoint_smells_report()
-        self.get_hyperparameter_smells_report()
-        self.get_evaluation_smells_report()
-        self.get_logging_smells_report()
-        self.get_init_smells_report()
-        self.get_agent_smells_report()
-        self.get_training_smells_report()
-
+        # one list of findings per active detector that found something, in registry order
+        for spec, detector in zip(self.specs, self.detectors):
+            report = getattr(detector, spec.report)
+            if callable(report):
+                report = report()
+            if report:
+                self.report.append(report)
         return self.report
-
-    def get_training_smells_report(self):
-        if self.training_smells.report:
-            self.report.append(self.training_smells.report)
-
-    def get_agent_smells_report(self):
-        agent_smells_report = self.agent_smells.get_report()
-        if agent_smells_report:
-            self.report.append(agent_smells_report)
-
-    def get_init_smells_report(self):
-        initialization_report = self.initialization_smells.get_report()
-        if initialization_report:
-            self.report.append(initialization_report)
-
-    def get_logging_smells_report(self):
-        logging_report = self.logging_smells.get_report()
-        if logging_report:
-            self.report.append(logging_report)
-
-    def get_evaluation_smells_report(self):
-        evaluation_report = self.evaluation_smells.get_report()
-        if evaluation_report:
-            self.report.append(evaluation_report)
-
-    def get_hyperparameter_smells_report(self):
-        hyperparameter_report = self.hyperparameter_smells.generate_report()
-        if hyperparameter_report:
-            self.report.append(hyperparameter_report)
-
-    def get_checkpoint_smells_report(self):
-        checkpoint_report = self.checkpoint_smells.get_report()
-        if checkpoint_report:
-            self.report.append(checkpoint_report)
-
-    def get_env_smells_report(self):
-        env_smells_report = self.environment_smells.get_report()
-        if env_smells_report:
-            self.report.append(env_smells_report)
\ No newline at end of file
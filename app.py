@@ -1,37 +1,56 @@
-import ast
+import asyncio
 import os
 import subprocess
 import tempfile
 import streamlit as st
-import plotly.express as px
 
-from typing import List
-from analyzer import Analyzer
+from detectors.registry import select_detectors
+from model.category import Category
+from model.findings_table import FindingsTable
 from model.report import Report
-from model.heuristic import Heuristic
-from pre_processing import RLScriptDetector
-from project_reader import ProjectReader, read_file
 from github_utils import get_repo_last_update
-from ui_utils import reports_to_dataframe
+from profiler import ProfileSummary
+from repo_cache import ReportCache, resolve_head
+from repo_clone import SPARSE
+from repo_pipeline import RepoRun, analyze_repository
+from ui_utils import PAGE_SIZE, ResultsView, findings_to_dataframe, page_count
+
+# rewrite the progress line every this many files
+PROGRESS_EVERY = 25
 
 st.set_page_config(page_title="RL Code Smell Detector", layout="wide")
 st.title("RL Code Smell Detector")
 st.write("Analyze a GitHub repository for RL-specific code smells.")
 
-if "df" not in st.session_state:
-    st.session_state.df = None
+if "results" not in st.session_state:
+    st.session_state.results = None
+if "category_figure" not in st.session_state:
+    st.session_state.category_figure = None
 if "repo_age_days" not in st.session_state:
     st.session_state.repo_age_days = None
 if "selected_category" not in st.session_state:
     st.session_state.selected_category = None
 if "repo_url" not in st.session_state:
     st.session_state.repo_url = ""
+if "profile" not in st.session_state:
+    st.session_state.profile = None
 
 repo_url = st.text_input(
     "Enter GitHub repository URL (HTTPS)",
     placeholder="https://github.com/username/repo"
 )
 
+all_categories = list(Category.__members__)
+selected_categories = st.multiselect("Detector categories", all_categories, default=all_categories)
+if len(selected_categories) == len(all_categories):
+    # every detector, so cached reports are shared with the other full runs
+    detectors = None
+elif selected_categories:
+    detectors = select_detectors(",".join(selected_categories))
+else:
+    detectors = ()
+profile_enabled = st.checkbox("Profile the analysis (time per detector and per file)")
+
 analyze_button, clear_button = st.columns([.15, 1])
 
 with analyze_button:
@@ -40,105 +59,154 @@ with clear_button:
     clear_clicked = st.button("🔄 Clear Results", type="primary", use_container_width=False)
 
 if clear_clicked:
-    st.session_state.df = None
+    st.session_state.results = None
+    st.session_state.category_figure = None
     st.session_state.repo_age_days = None
     st.session_state.selected_category = None
+    st.session_state.profile = None
     st.rerun()
 
 
-def clone_repo():
-    st.info("⏳ Cloning repository... this may take a moment ⏳")
-    subprocess.run(["git", "clone", repo_url, tmpdir], check=True)
+def cloned_head():
+    return subprocess.run(["git", "rev-parse", "HEAD"], cwd=tmpdir, capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+def add_result(run, result):
+    # called for every file while the analysis is still running
+    if result.profile is not None:
+        profile_summary.add(result.profile)
+    if result.error is not None:
+        st.error(f"Error analyzing {result.path}: {result.error}")
+    elif result.report is not None and result.report.heuristics:
+        findings.add_report(result.report)
+    if run.analyzed % PROGRESS_EVERY == 0 or run.analyzed == run.files:
+        progress.text(f"🔍 Analyzed {run.analyzed} of {run.files} files, {len(findings)} findings so far 🔍")
 
 
-def run_static_analysis():
-    global filename, analyzer, e
-    try:
-        filename = os.path.basename(fpath)
-        rl_detector = RLScriptDetector()
-        if rl_detector.analyze(fpath):
-            tree = ast.parse(read_file(fpath))
-            analyzer = Analyzer()
-            analyzer.visit(tree)
+def show_results(findings):
+    # computed once per analysis, reruns only read these back; plotly is only
+    # imported once there is something to plot
+    import plotly.express as px
+
+    results = ResultsView(findings_to_dataframe(findings), repo_url, st.session_state.repo_age_days)
+    st.session_state.results = results
+    st.session_state.category_figure = px.bar(
+        results.category_counts,
+        x="Category",
+        y="Count",
+        title="Distribution of RL Code Smells by Category (Click on a bar to see details)",
+        color="Category",
+        custom_data=["Category"]
+    )
 
-            detected_heuristics: List[Heuristic] = [
-                item for sublist in analyzer.get_report() for item in sublist
-            ]
 
-            if detected_heuristics:
-                reports.append(Report(filename, detected_heuristics))
-    except Exception as e:
-        st.error(f"Error analyzing {fpath}: {e}")
+def paginated_dataframe(get_page, total_rows, key):
+    # only the requested page of rows is sent to the browser
+    pages = page_count(total_rows)
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (1-{pages}, {PAGE_SIZE} rows each)", min_value=1, max_value=pages,
+                               value=1, step=1, key=key)
+    st.dataframe(get_page(page - 1), width="stretch")
 
 
 if analyze_clicked:
     if not repo_url.strip():
         st.error("Please enter a GitHub repository URL")
+    elif detectors == ():
+        st.error("Please select at least one detector category")
     else:
-        st.session_state.df = None
+        st.session_state.results = None
+        st.session_state.category_figure = None
         st.session_state.repo_age_days = None
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            try:
-                clone_repo()
-
-                st.info("📊 Fetching repository metadata... 📊")
-                repo_age = get_repo_last_update(repo_url)
-                if repo_age is not None:
-                    st.session_state.repo_age_days = repo_age
-
-                reader = ProjectReader(tmpdir)
-                files = reader.list_files()
-
-                st.info("🔍 Running static analysis... 🔍")
-                reports: List[Report] = []
-
-                for fpath in files:
-                    run_static_analysis()
-
-
-                if reports:
-                    st.session_state.df = reports_to_dataframe(reports)
+        st.session_state.selected_category = None
+        st.session_state.profile = None
+
+        try:
+            head_sha = resolve_head(repo_url)
+        except ValueError as e:
+            st.error(f"Failed to read repository: {e}")
+            head_sha = None
+
+        if head_sha is not None:
+            with ReportCache(detectors=detectors) as report_cache:
+                # a profiled run has to analyze, a cached report has no timings
+                findings = None if profile_enabled else report_cache.get(repo_url, head_sha)
+
+                if findings is not None:
+                    st.info(f"⚡ Reusing the report of commit {head_sha[:12]}, the repository has not changed ⚡")
+                    st.info("📊 Fetching repository metadata... 📊")
+                    repo_age = get_repo_last_update(repo_url)
+                    if repo_age is not None:
+                        st.session_state.repo_age_days = repo_age
+                else:
+                    with tempfile.TemporaryDirectory() as tmpdir:
+                        try:
+                            st.info("⏳ Cloning repository and fetching its metadata... this may take a moment ⏳")
+                            findings = FindingsTable()
+                            profile_summary = ProfileSummary()
+                            progress = st.empty()
+
+                            # clone and metadata request run concurrently, files are analyzed
+                            # as soon as the clone is there
+                            run = asyncio.run(analyze_repository(RepoRun(repo_url, tmpdir), add_result,
+                                                                 profile=profile_enabled, detectors=detectors))
+                            if run.index is not None:
+                                # "missing" findings no other module of the repository resolves
+                                for path, (_, heuristics) in run.index.corrections().items():
+                                    if heuristics:
+                                        findings.add_report(Report(os.path.basename(path), heuristics))
+                            if run.strategy != SPARSE:
+                                st.info(f"The server does not support shallow sparse clones, used a {run.strategy} clone instead")
+                            if run.repo_age_days is not None:
+                                st.session_state.repo_age_days = run.repo_age_days
+                            # HEAD may have moved since ls-remote, key the report by what was analyzed
+                            head_sha = cloned_head()
+
+                            if profile_enabled:
+                                st.session_state.profile = profile_summary.to_json()
+                            report_cache.put(repo_url, head_sha, findings)
+
+                        except subprocess.CalledProcessError as e:
+                            st.error(f"Failed to clone repository: {e}")
+                            findings = None
+
+            if findings is not None:
+                if len(findings):
+                    show_results(findings)
                 else:
                     st.success("✅ No RL-specific code smells detected!")
 
-            except subprocess.CalledProcessError as e:
-                st.error(f"Failed to clone repository: {e}")
-
-if st.session_state.df is not None:
+if st.session_state.profile is not None:
+    profile = st.session_state.profile
+    st.subheader("Analysis Profile")
+    st.write(f"{profile['files_profiled']} files parsed in {profile['parse_seconds']:.2f}s, "
+             f"classified in {profile['classify_seconds']:.2f}s, analyzed in {profile['analysis_seconds']:.2f}s")
+    st.write("Hottest detectors")
+    st.table(profile["hottest_detectors"])
+    st.write("Slowest files")
+    st.table(profile["slowest_files"])
+
+if st.session_state.results is not None:
+    results = st.session_state.results
     if st.session_state.repo_age_days is not None:
         st.info(f"📅 The repository has not been updated for: {st.session_state.repo_age_days} days 📅")
 
     st.subheader("Analysis Results")
-    st.dataframe(st.session_state.df, width="stretch")
+    paginated_dataframe(results.page, len(results.df), key="results_page")
 
-    csv = st.session_state.df.to_csv(index=False).encode("utf-8")
     st.download_button(
         label="📥 Download Full Report as CSV",
-        data=csv,
+        data=results.report_csv,
         file_name="rl_code_smell_report.csv",
         mime="text/csv",
     )
 
     st.subheader("Distribution of Code Smells by Category")
-    category_counts = (
-        st.session_state.df[st.session_state.df["Is Code Smell"] == True]["Category"]
-        .value_counts()
-        .reset_index()
-    )
-    category_counts.columns = ["Category", "Count"]
-
-    fig = px.bar(
-        category_counts,
-        x="Category",
-        y="Count",
-        title="Distribution of RL Code Smells by Category (Click on a bar to see details)",
-        color="Category",
-        custom_data=["Category"]
-    )
 
     # Handle click events on the chart
-    category_barchart = st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points", key="category_chart")
+    category_barchart = st.plotly_chart(st.session_state.category_figure, use_container_width=True, on_select="rerun", selection_mode="points", key="category_chart")
 
     # Update selected category based on click
     if category_barchart and category_barchart.selection and category_barchart.selection.points:
@@ -150,38 +218,22 @@ if st.session_state.df is not None:
 
     if st.session_state.selected_category is not None:
         st.subheader(f"Code Smells in Category: {st.session_state.selected_category}")
-        filtered_df = st.session_state.df[
-            (st.session_state.df["Is Code Smell"] == True) &
-            (st.session_state.df["Category"] == st.session_state.selected_category)
-        ]
+        category_size = results.category_size(st.session_state.selected_category)
 
-        if not filtered_df.empty:
-                display_columns = ["File", "Smell", "Details", "Line"]
-                st.dataframe(filtered_df[display_columns], width="stretch")
-
-    total_smells = category_counts["Count"].sum()
-    category_counts["Percentage"] = (category_counts["Count"] / total_smells * 100).round(2)
+        if category_size:
+            paginated_dataframe(
+                lambda page: results.category_page(st.session_state.selected_category, page),
+                category_size,
+                key=f"category_page_{st.session_state.selected_category}",
+            )
 
     # Display table with categories and percentages
     st.subheader("Code Smell Category Breakdown")
-    category_table = category_counts[["Category", "Count", "Percentage"]].copy()
-    category_table.columns = ["Code Smell Category", "Nr of Occurrences", "Percentage"]
-    category_table["Percentage"] = category_table["Percentage"].astype(str) + " %"
-    category_table["Nr of Occurrences"] = category_table["Nr of Occurrences"].astype(str)
-
-    st.table(category_table)
-
-    # Prepare CSV data with repository info
-    category_csv_data = category_counts.copy()
-    category_csv_data["Repository"] = repo_url
-    category_csv_data["Repository Age (days)"] = st.session_state.repo_age_days if st.session_state.repo_age_days is not None else "N/A"
-    # Reorder columns to put repo info first
-    category_csv_data = category_csv_data[["Repository", "Repository Age (days)", "Category", "Count", "Percentage"]]
+    st.table(results.category_table)
 
-    category_csv = category_csv_data.to_csv(index=False).encode("utf-8")
     st.download_button(
         label="📥 Download Category Breakdown as CSV",
-        data=category_csv,
+        data=results.category_csv,
         file_name="rl_code_smell_category_breakdown.csv",
         mime="text/csv",
     )
@@ -0,0 +1,298 @@
+"""
+Non-interactive scan of one or more projects, for cron jobs and CI.
+
+    python batch.py PROJECT [PROJECT ...] [--manifest FILE] [--jobs N] [--max-smells N]
+    python batch.py --repo URL [--repo URL ...] [--max-clones N]
+    python batch.py --from-git REV REPOSITORY [REPOSITORY ...]
+
+Every project gets ./results/<name>/report.csv, the run writes ./results/summary.csv.
+Exit codes: 0 ok, 1 a project has more code smells than --max-smells, 2 bad usage or
+project path, 3 some files could not be analyzed (only with --fail-on-errors).
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+from itertools import chain, islice
+
+from cli_utils import RunStats
+from detectors.registry import indexed_detectors, select_detectors
+from executor import analyze_files, analyze_sources, default_jobs
+from model.file_error import FileError
+from pipeline import index_file, index_source
+from profiler import ProfileSummary
+from project_index import ProjectIndex, resolve_results
+from project_reader import ProjectReader
+from repo_cache import normalize_repo_url
+from repo_clone import MAX_CONCURRENT_CLONES
+from report_writer import ReportWriter
+from result_cache import DEFAULT_CACHE_PATH
+
+EXIT_OK = 0
+EXIT_SMELLS_ABOVE_THRESHOLD = 1
+EXIT_USAGE = 2
+EXIT_FILE_ERRORS = 3
+
+SUMMARY_HEADER = ["Project", "Path", "Files scanned", "Files analyzed", "Errors", "Findings", "Code smells"]
+
+
+class ProjectRun:
+    def __init__(self, name, path, file_paths):
+        self.name = name
+        self.path = path
+        self.file_paths = file_paths
+        # list_blobs entries when the project is read from git instead of the working tree
+        self.blobs = None
+        self.stats = RunStats()
+        self.errors = 0
+        self.findings = 0
+        self.code_smells = 0
+        self.profile = None
+
+    def add(self, result, report_writer, file_path=None):
+        # file_path replaces result.path in the report, e.g. relative to a clone
+        file_path = file_path or result.path
+        self.stats.add(result)
+        if result.profile is not None:
+            self.profile.add(result.profile)
+        if result.error is not None:
+            self.errors += 1
+            print(f"Error analyzing {file_path}: {result.error}", file=sys.stderr)
+        elif result.report is not None:
+            for row in report_writer.write(file_path, result.report):
+                self.findings += 1
+                if row[4] is True:
+                    self.code_smells += 1
+
+    def correct(self, report_writer, index, relative_to=None):
+        # once report_writer is closed: the project's "missing" findings as the whole
+        # project resolves them, see ProjectIndex.corrections; relative_to is the folder
+        # report paths are relative to, as for add
+        corrections = index.corrections()
+        if relative_to is not None:
+            corrections = {os.path.relpath(path, relative_to): correction for path, correction in corrections.items()}
+        rows, code_smells = report_writer.correct(corrections)
+        self.findings += rows
+        self.code_smells += code_smells
+
+    def index_module(self, detectors):
+        # ProjectIndex.index_module for a file of this project, from git when it was
+        # read from there
+        if self.blobs is None:
+            return lambda path: index_file(path, detectors)
+        blobs = {blob[0]: blob for blob in self.blobs}
+
+        def index_blob(path):
+            for _, data, _ in ProjectReader(self.path).read_blobs([blobs[path]]):
+                return None if isinstance(data, FileError) else index_source(path, data, detectors)
+
+        return index_blob
+
+    def summary_row(self):
+        return [self.name, self.path, self.stats.scanned, self.stats.analyzed, self.errors, self.findings,
+                self.code_smells]
+
+
+def read_manifest(manifest_path):
+    # one project path per line, blank lines and # comments are skipped,
+    # relative paths are relative to the manifest itself
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, encoding="utf-8") as manifest:
+        lines = [line.split("#", 1)[0].strip() for line in manifest]
+    return [os.path.join(base, line) for line in lines if line]
+
+
+def project_names(paths):
+    # results/<name> per project, basenames that repeat get a numeric suffix
+    names = []
+    used = set()
+    for path in paths:
+        base = os.path.basename(os.path.normpath(path)) or "project"
+        name, suffix = base, 2
+        while name in used:
+            name, suffix = f"{base}-{suffix}", suffix + 1
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def save_summary_csv(projects, summary_path):
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    with open(summary_path, mode='w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(SUMMARY_HEADER)
+        writer.writerows(project.summary_row() for project in projects)
+
+
+def scan(projects, jobs, cache_path, profile=False, detectors=None):
+    # one pool for every file of every project, so the worker budget is shared and a
+    # small project does not leave workers idle; results come back in project order
+    if any(project.blobs is not None for project in projects):
+        # contents streamed from each repository's object store, one project at a time
+        sources = chain.from_iterable(ProjectReader(project.path).read_blobs(project.blobs) for project in projects)
+        results = analyze_sources(sources, jobs, cache_path, profile, detectors)
+    else:
+        all_paths = [path for project in projects for path in project.file_paths]
+        results = analyze_files(all_paths, jobs, cache_path, profile, detectors)
+
+    for project in projects:
+        if profile:
+            project.profile = ProfileSummary()
+        project_results = islice(results, len(project.file_paths))
+        index = None
+        if indexed_detectors(detectors):
+            # "missing" findings are checked against the other modules of the same project
+            index = ProjectIndex(project.path, project.index_module(detectors))
+            project_results = resolve_results(project_results, index)
+        with ReportWriter(project.name) as report_writer:
+            for result in project_results:
+                project.add(result, report_writer)
+        if index is not None:
+            project.correct(report_writer, index)
+        if profile:
+            project.profile.write(report_writer.folder)
+        print(f"{project.name}: {project.stats.analyzed} of {project.stats.scanned} files analyzed, "
+              f"{project.code_smells} code smells")
+
+
+def scan_repositories(projects, jobs, cache_path, profile=False, max_clones=MAX_CONCURRENT_CLONES, detectors=None):
+    # clones (at most max_clones at a time) into a temporary folder; every repository
+    # is analyzed as soon as its clone is there, report paths are relative to the clone
+    # (asyncio is only imported by runs with --repo)
+    import asyncio
+
+    from repo_pipeline import RepoRun, analyze_repositories
+
+    with tempfile.TemporaryDirectory() as folder:
+        runs = []
+        for index, project in enumerate(projects):
+            runs.append(RepoRun(project.path, os.path.join(folder, str(index))))
+            os.makedirs(runs[-1].folder)
+        projects_by_run = {id(run): project for run, project in zip(runs, projects)}
+        report_writers = {}
+
+        def report_writer_for(project):
+            if project.name not in report_writers:
+                report_writers[project.name] = ReportWriter(project.name)
+                if profile:
+                    project.profile = ProfileSummary()
+            return report_writers[project.name]
+
+        def finish(project, run):
+            report_writer = report_writer_for(project)
+            report_writer.close()
+            if run.index is not None:
+                project.correct(report_writer, run.index, run.folder)
+            if profile:
+                project.profile.write(report_writer.folder)
+            print(f"{project.name}: {project.stats.analyzed} of {project.stats.scanned} files analyzed, "
+                  f"{project.code_smells} code smells")
+
+        def add_result(run, result):
+            project = projects_by_run[id(run)]
+            project.add(result, report_writer_for(project), os.path.relpath(result.path, run.folder))
+            if run.analyzed == run.files:
+                # the last result is through resolve_results, every file is in run.index
+                finish(project, run)
+
+        # the summary has no use for the GitHub metadata, skip the request
+        asyncio.run(analyze_repositories(runs, add_result, max_clones, jobs, cache_path, profile,
+                                         fetch_metadata=lambda repo_url: None, detectors=detectors))
+
+        for run, project in zip(runs, projects):
+            if run.error is not None:
+                project.errors += 1
+                detail = getattr(run.error, "stderr", None) or str(run.error)
+                print(f"Could not clone {run.repo_url}: {detail.strip()}", file=sys.stderr)
+                # an empty report when the clone failed before any file came in, without
+                # truncating the one results were already written to
+                report_writer = report_writers.pop(project.name, None)
+                if report_writer is None:
+                    report_writer = ReportWriter(project.name)
+                report_writer.close()
+            elif run.files == 0:
+                finish(project, run)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("projects", nargs="*", help="project folders to scan")
+    parser.add_argument("--manifest", help="file listing project folders, one per line")
+    parser.add_argument("--repo", action="append", default=[],
+                        help="git repository URL to clone and scan, can be repeated")
+    parser.add_argument("--max-clones", type=int, default=MAX_CONCURRENT_CLONES,
+                        help=f"repositories cloned at the same time (default: {MAX_CONCURRENT_CLONES})")
+    parser.add_argument("--jobs", type=int, default=default_jobs(),
+                        help="worker processes shared by all projects (default: number of CPUs)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"analyze every file again instead of reusing results from {DEFAULT_CACHE_PATH}")
+    parser.add_argument("--max-smells", type=int,
+                        help="exit with 1 when a project has more code smells than this")
+    parser.add_argument("--fail-on-errors", action="store_true",
+                        help="exit with 3 when a file could not be analyzed")
+    parser.add_argument("--only", metavar="DETECTORS",
+                        help="comma-separated categories or detectors to run, e.g. HYPERPARAMETER,TRAINING "
+                             "(default: all)")
+    parser.add_argument("--profile", action="store_true",
+                        help="write profile.json (slowest files, hottest detectors) next to each report.csv")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                        help="skip files and folders matching this .gitignore-style pattern (repeatable)")
+    parser.add_argument("--from-git", metavar="REV",
+                        help="read project files from a git revision (e.g. HEAD) instead of the working tree, "
+                             "bare repositories work too")
+    parser.add_argument("--summary", default=os.path.join("./results", "summary.csv"),
+                        help="where to write the combined summary (default: ./results/summary.csv)")
+    args = parser.parse_args(argv)
+
+    try:
+        detectors = select_detectors(args.only)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return EXIT_USAGE
+
+    paths = list(args.projects)
+    try:
+        if args.manifest:
+            paths.extend(read_manifest(args.manifest))
+    except OSError as e:
+        print(f"Could not read manifest: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not paths and not args.repo:
+        parser.print_usage(sys.stderr)
+        print("No project given.", file=sys.stderr)
+        return EXIT_USAGE
+
+    projects = []
+    names = project_names(paths + [normalize_repo_url(repo_url) for repo_url in args.repo])
+    for name, path in zip(names, paths):
+        try:
+            if args.from_git:
+                blobs = ProjectReader(path, args.exclude).list_blobs(args.from_git)
+                project = ProjectRun(name, path, [blob_path for blob_path, _, _ in blobs])
+                project.blobs = blobs
+            else:
+                project = ProjectRun(name, path, ProjectReader(path, args.exclude).list_files())
+            projects.append(project)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return EXIT_USAGE
+    repositories = [ProjectRun(name, repo_url, []) for name, repo_url in zip(names[len(paths):], args.repo)]
+
+    cache_path = None if args.no_cache else DEFAULT_CACHE_PATH
+    scan(projects, args.jobs, cache_path, args.profile, detectors)
+    if repositories:
+        scan_repositories(repositories, args.jobs, cache_path, args.profile, args.max_clones, detectors)
+        projects.extend(repositories)
+    save_summary_csv(projects, args.summary)
+    print(f"Summary written to {args.summary}")
+
+    if args.max_smells is not None and any(project.code_smells > args.max_smells for project in projects):
+        return EXIT_SMELLS_ABOVE_THRESHOLD
+    if args.fail_on_errors and any(project.errors for project in projects):
+        return EXIT_FILE_ERRORS
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
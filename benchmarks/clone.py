@@ -0,0 +1,92 @@
+"""
+Bytes received and wall time of each clone strategy in repo_clone, against a local
+fixture repository whose history is mostly large non-Python files.
+
+    python -m benchmarks.clone [--files N] [--assets N] [--asset-mb N] [--commits N]
+
+The fixture is served over file:// so git uses the real pack protocol (a plain path
+would hardlink objects and ignore --depth / --filter). It is cloned once with
+uploadpack.allowFilter on and once with it off, the latter being a server without
+partial clone support. "received" is the size of the clone's object store, i.e. what
+came over the wire; "tree" is what was checked out.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import write_corpus
+from repo_clone import CLONE_STRATEGIES, FULL, SHALLOW, SPARSE, clone_repository
+
+
+def git(args, cwd):
+    subprocess.run(["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def make_fixture(folder, files, assets, asset_mb, commits):
+    os.makedirs(folder)
+    git(["init", "-q"], folder)
+    write_corpus(folder, files=files)
+    for commit in range(commits):
+        # every commit rewrites the assets, as with checked-in models or datasets
+        os.makedirs(os.path.join(folder, "assets"), exist_ok=True)
+        for i in range(assets):
+            with open(os.path.join(folder, "assets", f"model_{i}.bin"), "wb") as file:
+                file.write(os.urandom(asset_mb * 1024 * 1024))
+        git(["add", "-A"], folder)
+        git(["commit", "-q", "-m", f"commit {commit}"], folder)
+
+
+def folder_size(folder, skip_git):
+    total = count = 0
+    for root, dirs, names in os.walk(folder):
+        if skip_git and ".git" in dirs:
+            dirs.remove(".git")
+        for name in names:
+            total += os.path.getsize(os.path.join(root, name))
+            count += 1
+    return total, count
+
+
+def measure(url, strategy, folder):
+    target = os.path.join(folder, f"clone_{strategy}_{time.monotonic_ns()}")
+    os.makedirs(target)
+    start = time.perf_counter()
+    used = clone_repository(url, target, strategies=(strategy,) + tuple(s for s in CLONE_STRATEGIES if s != strategy))
+    elapsed = time.perf_counter() - start
+    received, _ = folder_size(os.path.join(target, ".git", "objects"), skip_git=False)
+    tree_bytes, tree_files = folder_size(target, skip_git=True)
+    return used, elapsed, received, tree_bytes, tree_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="Python files in the fixture")
+    parser.add_argument("--assets", type=int, default=4, help="binary files in the fixture")
+    parser.add_argument("--asset-mb", type=int, default=8, help="size of each binary file")
+    parser.add_argument("--commits", type=int, default=5, help="commits, each rewriting every binary file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        origin = os.path.join(folder, "origin")
+        make_fixture(origin, args.files, args.assets, args.asset_mb, args.commits)
+        print(f"fixture: {args.files} .py files, {args.assets} x {args.asset_mb} MiB binaries, {args.commits} commits\n")
+
+        print(f"{'server':<16}{'strategy':<10}{'used':<10}{'wall (s)':>10}{'received (MiB)':>16}"
+              f"{'tree (MiB)':>12}{'tree files':>12}")
+        for allow_filter in ("true", "false"):
+            git(["config", "uploadpack.allowFilter", allow_filter], origin)
+            server = "partial clone" if allow_filter == "true" else "no filter"
+            for strategy in (FULL, SHALLOW, SPARSE):
+                used, elapsed, received, tree_bytes, tree_files = measure(f"file://{origin}", strategy, folder)
+                print(f"{server:<16}{strategy:<10}{used:<10}{elapsed:>10.3f}{received / 2 ** 20:>16.2f}"
+                      f"{tree_bytes / 2 ** 20:>12.2f}{tree_files:>12}")
+
+
+if __name__ == "__main__":
+    main()
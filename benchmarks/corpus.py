@@ -0,0 +1,172 @@
+"""
+Synthetic RL-script corpus for the benchmarks.
+
+    python -m benchmarks.corpus OUT_FOLDER [--files N] [--statements N] [--depth N] [--seed N]
+
+Scripts look like what the detectors are written for: gym / stable_baselines3 imports,
+hardcoded hyperparameters, env factories, a training loop, EvalCallback, logging and
+checkpointing, with nested blocks and call chains `depth` levels deep. A share of the
+files are plain helpers that are not RL scripts, as in a real repository.
+"""
+import argparse
+import os
+import random
+
+ALGORITHMS = ["PPO", "DQN", "A2C", "SAC", "TD3"]
+ENV_IDS = ["CartPole-v1", "LunarLander-v2", "Pendulum-v1", "MountainCar-v0", "Acrobot-v1"]
+HYPERPARAMETERS = ["learning_rate", "gamma", "batch_size", "epsilon", "max_steps", "lr_decay_rate",
+                   "target_update_interval", "weight_decay"]
+NON_RL_SHARE = 0.3
+
+
+def _nested_call(depth, rng):
+    # make_env(make_env(... "CartPole-v1" ...)) depth levels deep
+    call = repr(rng.choice(ENV_IDS))
+    for _ in range(depth):
+        call = f"{rng.choice(['make_env', 'wrap_env', 'Monitor'])}({call})"
+    return call
+
+
+def _loop_body(statements, depth, indent, rng):
+    lines = []
+    for i in range(statements):
+        kind = rng.random()
+        pad = " " * indent
+        if kind < 0.3:
+            lines.append(f"{pad}obs, reward, done, info = env.step(model.predict(obs)[0])")
+        elif kind < 0.45:
+            lines.append(f"{pad}logger.info('step %d reward %.2f', step, reward)")
+        elif kind < 0.55:
+            lines.append(f"{pad}episode_rewards.append(reward * gamma ** step)")
+        elif kind < 0.65 and depth > 0:
+            lines.append(f"{pad}if done and step % {rng.randint(2, 50)} == 0:")
+            lines.extend(_loop_body(max(1, statements // 8), depth - 1, indent + 4, rng))
+        elif kind < 0.72 and depth > 0:
+            lines.append(f"{pad}for agent_id in range(num_agents):")
+            lines.extend(_loop_body(max(1, statements // 8), depth - 1, indent + 4, rng))
+        elif kind < 0.8:
+            lines.append(f"{pad}model.save(os.path.join(checkpoint_dir, f'model_{{step}}_{i}.zip'))")
+        elif kind < 0.9:
+            lines.append(f"{pad}stats_{i} = np.mean(episode_rewards[-{rng.randint(5, 100)}:])")
+        else:
+            lines.append(f"{pad}action = env.action_space.sample()")
+        if len(lines) >= statements:
+            break
+    return lines or [" " * indent + "pass"]
+
+
+def generate_rl_script(statements=200, depth=3, seed=0):
+    rng = random.Random(seed)
+    algorithm = rng.choice(ALGORITHMS)
+    lines = [
+        "import os",
+        "import logging",
+        "import numpy as np",
+        "import gym",
+        f"from stable_baselines3 import {algorithm}",
+        "from stable_baselines3.common.callbacks import EvalCallback",
+        "from stable_baselines3.common.monitor import Monitor",
+    ]
+    if rng.random() < 0.3:
+        lines.append("import optuna")
+    lines.append("")
+    for name in rng.sample(HYPERPARAMETERS, k=rng.randint(3, len(HYPERPARAMETERS))):
+        lines.append(f"{name} = {rng.choice([0.99, 0.0003, 64, 1000, 0.1, 500])}")
+    lines += [
+        "multi_agent = True",
+        f"num_agents = {rng.randint(1, 8)}",
+        "checkpoint_dir = 'checkpoints'",
+        "logger = logging.getLogger(__name__)",
+        "",
+        "",
+        "def make_env(env_id):",
+        "    return gym.make(env_id) if isinstance(env_id, str) else env_id",
+        "",
+        "",
+        "def wrap_env(env):",
+        "    return env",
+        "",
+        "",
+        "def evaluate(model, eval_env, episodes=10):",
+        "    total = 0.0",
+        "    for _ in range(episodes):",
+        "        obs = eval_env.reset()",
+        "        done = False",
+        "        while not done:",
+        "            obs, reward, done, info = eval_env.step(model.predict(obs)[0])",
+        "            total += reward",
+        "    return total / episodes",
+        "",
+        "",
+        "def train(env, eval_env):",
+        f"    model = {algorithm}('MlpPolicy', env, learning_rate=learning_rate, verbose=0)",
+        f"    callback = EvalCallback({_nested_call(depth, rng)}, eval_freq=1000)",
+        "    model.learn(total_timesteps=max_steps, callback=callback)",
+        "    episode_rewards = []",
+        "    obs = env.reset()",
+        "    for step in range(max_steps):",
+    ]
+    lines += _loop_body(statements, depth, 8, rng)
+    lines += [
+        "    evaluate(model, eval_env)",
+        "    return model",
+        "",
+        "",
+        "if __name__ == '__main__':",
+        f"    env = make_env({rng.choice(ENV_IDS)!r})",
+        f"    eval_env = make_env({rng.choice(ENV_IDS)!r})",
+        "    train(env, eval_env)",
+        "    env.close()",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def generate_helper_module(statements=50, seed=0):
+    rng = random.Random(seed)
+    lines = ["import json", "import os", ""]
+    for i in range(max(1, statements // 5)):
+        lines += [
+            f"def helper_{i}(path, items):",
+            f"    data = [item * {rng.randint(1, 9)} for item in items]",
+            "    with open(os.path.join(path, 'out.json'), 'w') as handle:",
+            "        json.dump(data, handle)",
+            "    return len(data)",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def write_corpus(folder, files=100, statements=200, depth=3, seed=0):
+    # returns the written paths; about NON_RL_SHARE of them are helper modules
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        subfolder = os.path.join(folder, f"pkg_{i % 10}")
+        os.makedirs(subfolder, exist_ok=True)
+        if rng.random() < NON_RL_SHARE:
+            path = os.path.join(subfolder, f"helpers_{i}.py")
+            source = generate_helper_module(statements, seed + i)
+        else:
+            path = os.path.join(subfolder, f"train_{i}.py")
+            source = generate_rl_script(statements, depth, seed + i)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(source)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--statements", type=int, default=200, help="statements in each training loop")
+    parser.add_argument("--depth", type=int, default=3, help="nesting depth of blocks and call chains")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = write_corpus(args.folder, args.files, args.statements, args.depth, args.seed)
+    print(f"{len(paths)} files written to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
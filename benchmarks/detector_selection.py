@@ -0,0 +1,86 @@
+"""
+Cost of a run limited to some detectors (--only) against a full run.
+
+    python -m benchmarks.detector_selection [<file or folder> ...] [--only SELECTION ...] [--repeat N]
+
+Without paths a generated corpus is used. Every selection analyzes the same parsed
+trees, so "analysis" is detector time alone; "import" is a fresh interpreter
+building an Analyzer for the selection, i.e. the start-up a worker process pays.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analyzer import Analyzer
+from benchmarks.corpus import write_corpus
+from detectors.registry import detector_specs, select_detectors
+from project_reader import ProjectReader, read_source
+
+DEFAULT_SELECTIONS = ["HYPERPARAMETER", "HYPERPARAMETER,TRAINING", "EVALUATION,CODESTYLE"]
+
+
+def load_trees(paths):
+    trees = []
+    for path in paths:
+        file_paths = ProjectReader(path).list_files() if os.path.isdir(path) else [path]
+        for file_path in file_paths:
+            try:
+                trees.append(ast.parse(read_source(file_path)))
+            except (SyntaxError, ValueError):
+                continue
+    return trees
+
+
+def analysis_time(trees, detectors, repeat):
+    best = float("inf")
+    findings = 0
+    for _ in range(repeat):
+        findings = 0
+        start = time.perf_counter()
+        for tree in trees:
+            analyzer = Analyzer(detectors=detectors)
+            analyzer.visit(tree)
+            findings += sum(len(report) for report in analyzer.get_report())
+        best = min(best, time.perf_counter() - start)
+    return best, findings
+
+
+def import_time(detectors, repeat):
+    code = (f"import time; start = time.perf_counter(); from analyzer import Analyzer; "
+            f"Analyzer(detectors={detectors!r}); print(time.perf_counter() - start)")
+    return min(float(subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--only", action="append", help="selection to compare with a full run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        if not args.paths:
+            write_corpus(folder, files=100)
+        trees = load_trees(args.paths or [folder])
+
+    print(f"files: {len(trees)}")
+    print(f"{'selection':<28}{'detectors':>10}{'analysis (s)':>14}{'speedup':>9}{'import (ms)':>13}{'findings':>10}")
+    full_time = None
+    for selection in [None] + (args.only or DEFAULT_SELECTIONS):
+        detectors = select_detectors(selection)
+        elapsed, findings = analysis_time(trees, detectors, args.repeat)
+        full_time = full_time or elapsed
+        print(f"{selection or 'all':<28}{len(detector_specs(detectors)):>10}{elapsed:>14.4f}{full_time / elapsed:>8.2f}x"
+              f"{import_time(detectors, args.repeat) * 1000:>13.1f}{findings:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+File discovery on a project with a vendored virtualenv: the old os.walk listing
+against ProjectReader's pruning walker.
+
+    python -m benchmarks.file_discovery [--files N] [--packages N] [--modules N] [--repeat N]
+
+The fixture is a generated corpus next to a .venv holding --packages packages of
+--modules modules each (with __pycache__ folders), plus node_modules and a build
+folder. The old listing walks all of it and only drops paths under /venv/, so it
+also reports the .venv files; the walker never enters those folders. "first" is the
+time until the first path is available to the analysis.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import write_corpus
+from project_reader import walk_source_files
+
+
+def legacy_list_files(folder_path):
+    # ProjectReader.list_files before the pruning walker
+    return [
+        os.path.join(root, file)
+        for root, _, files in os.walk(folder_path)
+        if '/venv/' not in root.replace('\\', '/')
+        for file in files
+        if file.endswith('.py') and not file.startswith('._')
+    ]
+
+
+def write_file(path, text=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+def make_fixture(folder, files, packages, modules):
+    write_corpus(folder, files=files)
+    site_packages = os.path.join(folder, ".venv", "lib", "python3.11", "site-packages")
+    for package in range(packages):
+        for module in range(modules):
+            sub = f"sub_{module % 4}"
+            write_file(os.path.join(site_packages, f"package_{package}", sub, f"module_{module}.py"), "x = 1\n")
+            write_file(os.path.join(site_packages, f"package_{package}", sub, "__pycache__",
+                                    f"module_{module}.cpython-311.pyc"))
+    for package in range(packages // 4):
+        write_file(os.path.join(folder, "node_modules", f"package_{package}", "index.js"))
+        write_file(os.path.join(folder, "build", "lib", f"package_{package}.py"), "x = 1\n")
+
+
+def measure(list_function, folder, repeat):
+    total = first = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        paths = iter(list_function(folder))
+        next(paths, None)
+        first = min(first, time.perf_counter() - start)
+        count = 1 + sum(1 for _ in paths)
+        total = min(total, time.perf_counter() - start)
+    return total, first, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="project files")
+    parser.add_argument("--packages", type=int, default=200, help="packages in the virtualenv")
+    parser.add_argument("--modules", type=int, default=40, help="modules per package")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        make_fixture(folder, args.files, args.packages, args.modules)
+        print(f"fixture: {args.files} project files, {args.packages * args.modules} files in .venv\n")
+        print(f"{'listing':<10}{'total (ms)':>12}{'first (ms)':>12}{'files':>8}")
+        for name, list_function in (("os.walk", legacy_list_files), ("pruning", walk_source_files)):
+            total, first, count = measure(list_function, folder, args.repeat)
+            print(f"{name:<10}{total * 1000:>12.2f}{first * 1000:>12.2f}{count:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+github_utils.GitHubClient against a local stub of the GitHub commits API.
+
+    python -m benchmarks.github_client [--repos N] [--latency S] [--rate-limit N] [--reset S]
+
+The stub answers /repos/<owner>/<repo>/commits with an ETag and 304 for a matching
+If-None-Match, sleeps --latency seconds per request and allows --rate-limit full
+answers per --reset seconds, then 403 with X-RateLimit-* headers. The table shows
+wall time, TCP connections the stub accepted and 200 / 304 / 403 answers for the
+old one requests.get per repository, then the client cold, warm and rate limited.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_utils import GitHubClient
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, rate_limit, reset):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.reset = reset
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.remaining = rate_limit
+        self.connections = 0
+        self.answers = {200: 0, 304: 0, 403: 0, 404: 0}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, status):
+        with self.lock:
+            self.answers[status] += 1
+
+    def take_budget(self):
+        # (allowed, remaining, reset epoch)
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.reset:
+                self.window_start, self.remaining = now, self.rate_limit
+            reset_at = int(self.window_start + self.reset) + 1
+            if self.remaining == 0:
+                return False, 0, reset_at
+            self.remaining -= 1
+            return True, self.remaining, reset_at
+
+    def counters(self):
+        with self.lock:
+            counters = (self.connections, dict(self.answers))
+            self.connections = 0
+            self.answers = {status: 0 for status in self.answers}
+        return counters
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body=b"", headers=()):
+        self.server.count(status)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if len(parts) != 4 or parts[0] != "repos" or parts[3] != "commits":
+            return self.send(404)
+        body = json.dumps([{"commit": {"committer": {"date": "2024-01-01T00:00:00Z"}}}]).encode()
+        etag = '"' + hashlib.sha1(self.path.encode() + body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.send(304, headers=[("ETag", etag)])
+        allowed, remaining, reset_at = self.server.take_budget()
+        rate_headers = [("X-RateLimit-Limit", str(self.server.rate_limit)),
+                        ("X-RateLimit-Remaining", str(remaining)), ("X-RateLimit-Reset", str(reset_at))]
+        if not allowed:
+            return self.send(403, b'{"message": "API rate limit exceeded"}', rate_headers)
+        self.send(200, body, rate_headers + [("ETag", etag), ("Content-Type", "application/json")])
+
+
+def old_fetch(base_url, repo_urls):
+    # what get_repo_last_update did: a new connection per request, no cache
+    for repo_url in repo_urls:
+        owner, repo = repo_url.rstrip("/").split("/")[-2:]
+        requests.get(f"{base_url}/repos/{owner}/{repo}/commits", params={"per_page": 1})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the stub takes per request")
+    parser.add_argument("--rate-limit", type=int, default=10_000, help="full answers per reset window")
+    parser.add_argument("--reset", type=float, default=2.0, help="seconds per rate limit window")
+    args = parser.parse_args()
+
+    server = StubServer(args.latency, args.rate_limit, args.reset)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    repo_urls = [f"https://github.com/owner{i}/repo{i}" for i in range(args.repos)]
+
+    print(f"{'run':<34}{'wall (s)':>10}{'connections':>13}{'200':>6}{'304':>6}{'403':>6}")
+
+    def row(label, function):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        connections, answers = server.counters()
+        print(f"{label:<34}{elapsed:>10.3f}{connections:>13}{answers[200]:>6}{answers[304]:>6}{answers[403]:>6}")
+        return result
+
+    with tempfile.TemporaryDirectory() as folder:
+        row("requests.get per repository", lambda: old_fetch(server.url, repo_urls))
+        with GitHubClient(server.url, cache_path=os.path.join(folder, "github.sqlite3")) as client:
+            row("client bulk, cold cache", lambda: client.repo_ages_days(repo_urls))
+            row("client bulk, warm cache (304)", lambda: client.repo_ages_days(repo_urls))
+
+        # a fresh cache and a budget of a quarter of the repositories per window
+        server.rate_limit = server.remaining = max(1, args.repos // 4)
+        server.window_start = time.time()
+        with GitHubClient(server.url, cache_path=os.path.join(folder, "limited.sqlite3")) as client:
+            ages = row(f"client bulk, {server.rate_limit} per {args.reset}s",
+                       lambda: client.repo_ages_days(repo_urls))
+        print(f"\nrate limited run: {sum(age is not None for age in ages.values())} of {len(ages)} ages resolved")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Start-up cost of the analysis core, and a guard that it needs nothing beyond the
+standard library.
+
+    python -m benchmarks.import_time [--repeat N] [--max-ms MS]
+
+Every entry point is imported in a fresh interpreter started with -S, so
+site-packages is not on the path and a third-party import anywhere in the core
+fails the run. A second, normal interpreter checks that none of HEAVY_MODULES got
+imported as a side effect. Exits with 1 on either failure, or when an entry point
+takes longer than --max-ms.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# what a CLI or pre-commit run imports before looking at a file
+ENTRY_POINTS = {
+    "main": ["main"],
+    "batch": ["batch"],
+    "core": ["project_reader", "pre_processing", "analyzer", "pipeline", "executor", "report_writer",
+             "cli_utils", "result_cache", "project_index", "model.findings_table", "model.file_error"]
+              + ["detectors.registry", "detectors.environment_smells_detector",
+                 "detectors.checkpoint_smells_detector", "detectors.hyperaparmeters_smells_detector",
+                 "detectors.evaluation_smells_detector", "detectors.logging_detector",
+                 "detectors.initialization_smells_detector", "detectors.agent_smells_detector",
+                 "detectors.training_smells_detector"],
+}
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "streamlit", "openai", "requests"]
+
+
+def _run(code, no_site):
+    command = [sys.executable] + (["-S"] if no_site else []) + ["-c", code]
+    return subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+
+
+def import_seconds(modules, repeat=5):
+    # best wall time of importing modules in a fresh stdlib-only interpreter;
+    # ImportError (with the missing module) when the core needs a third-party package
+    code = (f"import sys, time; sys.path.insert(0, {ROOT!r}); start = time.perf_counter(); "
+            f"[__import__(name) for name in {modules!r}]; print(time.perf_counter() - start)")
+    best = None
+    for _ in range(repeat):
+        process = _run(code, no_site=True)
+        if process.returncode != 0:
+            raise ImportError(process.stderr.strip().splitlines()[-1])
+        seconds = float(process.stdout)
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def heavy_imports(modules):
+    # HEAVY_MODULES loaded by importing modules with site-packages available
+    code = (f"import sys; sys.path.insert(0, {ROOT!r}); [__import__(name) for name in {modules!r}]; "
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    process = _run(code, no_site=False)
+    if process.returncode != 0:
+        raise ImportError(process.stderr.strip().splitlines()[-1])
+    return [name for name in process.stdout.strip().split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="best of N interpreters")
+    parser.add_argument("--max-ms", type=float, help="fail when an entry point takes longer")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'entry point':<14}{'import (ms)':>12}  heavy modules")
+    for name, modules in ENTRY_POINTS.items():
+        try:
+            seconds = import_seconds(modules, args.repeat)
+            heavy = heavy_imports(modules)
+        except ImportError as e:
+            print(f"{name:<14}{'failed':>12}  {e}")
+            failed = True
+            continue
+        too_slow = args.max_ms is not None and seconds * 1000 > args.max_ms
+        failed = failed or too_slow or bool(heavy)
+        print(f"{name:<14}{seconds * 1000:>12.1f}  {', '.join(heavy) or '-'}{'  too slow' if too_slow else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Per-node match cost of the detector pattern lists: a loop of re.search/re.fullmatch
+calls versus the compiled PatternSet, without and with its memo cache.
+
+    python -m benchmarks.pattern_set <file or folder> [...]
+"""
+import argparse
+import ast
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.traversal import collect_files
+from detectors.agent_smells_detector import random_patterns
+from detectors.checkpoint_smells_detector import checkpoint_saving_pattern, lib_specific_checkpoint_saving_pattern
+from detectors.evaluation_smells_detector import evaluation_patterns
+from detectors.hyperaparmeters_smells_detector import hyperparameter_patterns, tuning_function_patterns
+from detectors.pattern_set import PatternSet
+from project_reader import read_source
+
+PATTERN_LISTS = {
+    "hyperparameter_patterns": (hyperparameter_patterns, False),
+    "tuning_function_patterns": (tuning_function_patterns, False),
+    "evaluation_patterns": (evaluation_patterns, True),
+    "checkpoint_saving_pattern": ([checkpoint_saving_pattern, lib_specific_checkpoint_saving_pattern], False),
+    "random_patterns": (random_patterns, False),
+}
+
+
+def collect_identifiers(paths):
+    # one entry per Name/Attribute node, repeats included, as the detectors see them
+    identifiers = []
+    for file_path in collect_files(paths):
+        try:
+            tree = ast.parse(read_source(file_path))
+        except SyntaxError:
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                identifiers.append(node.id)
+            elif isinstance(node, ast.Attribute):
+                identifiers.append(node.attr)
+    return identifiers
+
+
+def time_per_node(match, identifiers):
+    start = time.perf_counter()
+    for identifier in identifiers:
+        match(identifier)
+    return (time.perf_counter() - start) / len(identifiers) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=["."])
+    args = parser.parse_args()
+
+    identifiers = collect_identifiers(args.paths)
+    if not identifiers:
+        print("no identifiers found")
+        return
+    print(f"nodes: {len(identifiers)}, distinct identifiers: {len(set(identifiers))}")
+    print(f"{'pattern list':28}{'re loop (ns)':>14}{'uncached (ns)':>15}{'cached (ns)':>13}")
+    for name, (patterns, fullmatch) in PATTERN_LISTS.items():
+        function = re.fullmatch if fullmatch else re.search
+
+        def loop(text):
+            return any(function(pattern, text) for pattern in patterns)
+
+        pattern_set = PatternSet(patterns, fullmatch=fullmatch)
+        loop_ns = time_per_node(loop, identifiers)
+        uncached_ns = time_per_node(pattern_set._match, identifiers)
+        cached_ns = time_per_node(pattern_set.match, identifiers)
+        print(f"{name:28}{loop_ns:>14.0f}{uncached_ns:>15.0f}{cached_ns:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Cost and effect of the project index (see project_index) on a project whose
+scripts leave checkpointing, evaluation and logging to helper modules.
+
+    python -m benchmarks.project_index [--scripts N] [--helpers N] [--repeat N]
+
+--scripts training scripts call into --helpers helper modules of a package, by
+absolute and relative imports, through a second helper for a third of them.
+"analysis" is the run without the index, "resolve" what feeding its results
+through resolve_results and collecting index.corrections() adds, and "update"
+re-indexing one changed helper and resolving every script again. "missing"
+counts the findings without a line before and after resolving. The run ends with
+a check that two scripts calling into helpers that call each other both resolve
+their checkpoint, whichever of them is resolved first.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import analyze_files
+from pipeline import index_file
+from project_index import ProjectIndex, resolve_results
+from project_reader import ProjectReader
+
+HELPER = """\
+import logging
+import torch
+from stable_baselines3.common.callbacks import EvalCallback
+
+logger = logging.getLogger(__name__)
+
+
+def save_checkpoint_{i}(model, path):
+    torch.save(model.state_dict(), path)
+
+
+def make_callbacks_{i}(env):
+    return [EvalCallback(env, eval_freq=1000)]
+
+
+def report_{i}(step, reward):
+    logger.info("step %d reward %.2f", step, reward)
+
+
+def finish_{i}(model, step, reward):
+    report_{i}(step, reward)
+    save_checkpoint_{i}(model, "final.pt")
+"""
+
+SCRIPT = """\
+import gym
+from stable_baselines3 import PPO
+{imports}
+
+env = gym.make("CartPole-v1")
+model = PPO("MlpPolicy", env, learning_rate=0.0003, gamma=0.99)
+model.learn(total_timesteps=10000, callback={callbacks})
+{finish}
+"""
+
+CYCLE_HELPERS = {
+    "a.py": "import torch\nfrom utils import b\n\n\ndef persist(model):\n"
+            "    torch.save(model.state_dict(), 'model.pt')\n    b.relay(model)\n",
+    "b.py": "from utils import a\n\n\ndef relay(model):\n    a.persist(model)\n",
+}
+CYCLE_SCRIPTS = {"first.py": ("a", "persist"), "second.py": ("b", "relay")}
+
+
+def write_project(folder, scripts, helpers):
+    package = os.path.join(folder, "agents")
+    os.makedirs(os.path.join(package, "utils"))
+    for path in (os.path.join(package, "__init__.py"), os.path.join(package, "utils", "__init__.py")):
+        open(path, "w").close()
+    for i in range(helpers):
+        with open(os.path.join(package, "utils", f"helpers_{i}.py"), "w", encoding="utf-8") as file:
+            file.write(HELPER.format(i=i))
+    for i in range(scripts):
+        h = i % helpers
+        if i % 3 == 0:
+            imports = f"from agents.utils import helpers_{h} as helpers"
+            callbacks, finish = f"helpers.make_callbacks_{h}(env)", f"helpers.finish_{h}(model, 0, 0.0)"
+        elif i % 3 == 1:
+            imports = f"from .utils.helpers_{h} import make_callbacks_{h}, report_{h}, save_checkpoint_{h}"
+            callbacks = f"make_callbacks_{h}(env)"
+            finish = f"report_{h}(0, 0.0)\nsave_checkpoint_{h}(model, 'final.pt')"
+        else:
+            imports = f"import agents.utils.helpers_{h}"
+            callbacks, finish = "None", f"agents.utils.helpers_{h}.finish_{h}(model, 0, 0.0)"
+        with open(os.path.join(package, f"train_{i}.py"), "w", encoding="utf-8") as file:
+            file.write(SCRIPT.format(imports=imports, callbacks=callbacks, finish=finish))
+
+
+def write_cycle_project(folder):
+    os.makedirs(os.path.join(folder, "utils"))
+    for name, source in CYCLE_HELPERS.items():
+        with open(os.path.join(folder, "utils", name), "w", encoding="utf-8") as file:
+            file.write(source)
+    for name, (helper, function) in CYCLE_SCRIPTS.items():
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as file:
+            file.write(SCRIPT.format(imports=f"from utils import {helper}", callbacks="None",
+                                     finish=f"{helper}.{function}(model)"))
+
+
+def cycle_resolved():
+    # the scripts' "missing" findings resolved in both orders, the memoized reach of
+    # one must not leave the other with a part of the cycle
+    with tempfile.TemporaryDirectory() as folder:
+        write_cycle_project(folder)
+        results = list(analyze_files(ProjectReader(folder).list_files(), 1, None))
+        scripts = [result.symbols for result in results if result.report is not None]
+        for order in (scripts, scripts[::-1]):
+            index = ProjectIndex(folder)
+            list(resolve_results(results, index))
+            # the helpers, which the byte prefilter rejects, are indexed before the
+            # scripts are resolved, so only the order of the scripts differs
+            for path in list(index.skipped.values()):
+                index.update(index_file(path))
+            for symbols in order:
+                if any(heuristic.name == "Missing checkpoint saving" for heuristic in index.unresolved(symbols)):
+                    return False
+    return len(scripts) == len(CYCLE_SCRIPTS)
+
+
+def missing_findings(results):
+    return sum(1 for result in results if result.report is not None
+               for heuristic in result.report.heuristics if heuristic.line_nr is None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scripts", type=int, default=300)
+    parser.add_argument("--helpers", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        write_project(folder, args.scripts, args.helpers)
+        file_paths = ProjectReader(folder).list_files()
+        analysis = resolve = update = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = list(analyze_files(file_paths, 1, None))
+            analysis = min(analysis, time.perf_counter() - start)
+            before = missing_findings(results)
+
+            start = time.perf_counter()
+            index = ProjectIndex(folder, index_file)
+            resolved = list(resolve_results(results, index))
+            corrections = index.corrections()
+            resolve = min(resolve, time.perf_counter() - start)
+            after = missing_findings(resolved) + sum(len(heuristics) for _, heuristics in corrections.values())
+
+            helper = next(result.symbols for result in results if "helpers_" in result.path)
+            start = time.perf_counter()
+            index.update(helper)
+            index.corrections()
+            update = min(update, time.perf_counter() - start)
+
+    print(f"files: {len(file_paths)}, indexed modules: {len(index.modules)}")
+    print(f"analysis {analysis:.3f}s, resolve {resolve * 1000:.1f} ms, update {update * 1000:.2f} ms")
+    print(f"missing findings: {before} -> {after}")
+    resolved = cycle_resolved()
+    print(f"mutually recursive helpers: {'resolved in both orders' if resolved else 'NOT resolved in both orders'}")
+    return 0 if resolved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
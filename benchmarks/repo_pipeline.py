@@ -0,0 +1,91 @@
+"""
+Time to first result and total latency of analyzing several repositories: the old
+sequential flow (clone, then metadata request, then analysis, one repository after
+the other) against repo_pipeline.analyze_repositories.
+
+    python -m benchmarks.repo_pipeline [--repos N] [--max-clones N] [--metadata-latency S] [--jobs N]
+
+Repositories are local fixtures served over file:// (see benchmarks/clone.py). The
+GitHub metadata request is replaced by a sleep of --metadata-latency seconds so the
+numbers do not depend on the network.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.clone import git, make_fixture
+from executor import analyze_files
+from project_reader import ProjectReader
+from repo_clone import clone_repository
+from repo_pipeline import RepoRun, analyze_repositories
+
+
+class Clock:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_result = None
+
+    def result(self, *_):
+        if self.first_result is None:
+            self.first_result = time.perf_counter() - self.start
+
+
+def sequential(urls, folder, fetch_metadata, jobs, clock):
+    for index, url in enumerate(urls):
+        target = os.path.join(folder, str(index))
+        os.makedirs(target)
+        clone_repository(url, target)
+        fetch_metadata(url)
+        for result in analyze_files(ProjectReader(target).list_files(), jobs):
+            clock.result(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=6)
+    parser.add_argument("--max-clones", type=int, default=2)
+    parser.add_argument("--metadata-latency", type=float, default=0.5, help="seconds per metadata request")
+    parser.add_argument("--files", type=int, default=150, help="Python files per repository")
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    def fetch_metadata(_):
+        time.sleep(args.metadata_latency)
+        return 0
+
+    with tempfile.TemporaryDirectory() as folder:
+        urls = []
+        for index in range(args.repos):
+            origin = os.path.join(folder, f"origin_{index}")
+            make_fixture(origin, args.files, assets=2, asset_mb=2, commits=2)
+            git(["config", "uploadpack.allowFilter", "true"], origin)
+            urls.append(f"file://{origin}")
+        print(f"{args.repos} repositories, {args.files} .py files each, "
+              f"{args.metadata_latency}s per metadata request\n")
+
+        print(f"{'flow':<28}{'first result (s)':>18}{'total (s)':>12}")
+        clock = Clock()
+        sequential(urls, os.path.join(folder, "sequential"), fetch_metadata, args.jobs, clock)
+        print(f"{'sequential':<28}{clock.first_result:>18.3f}{time.perf_counter() - clock.start:>12.3f}")
+
+        clock = Clock()
+        runs = []
+        for index, url in enumerate(urls):
+            runs.append(RepoRun(url, os.path.join(folder, "pipelined", str(index))))
+            os.makedirs(runs[-1].folder)
+        asyncio.run(analyze_repositories(runs, clock.result, args.max_clones, args.jobs,
+                                         fetch_metadata=fetch_metadata))
+        failed = [run.repo_url for run in runs if run.error is not None]
+        label = f"pipelined ({args.max_clones} clones)"
+        print(f"{label:<28}{clock.first_result:>18.3f}{time.perf_counter() - clock.start:>12.3f}")
+        if failed:
+            print(f"failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Scaling of TrainEvalCouplingDetector with the size of the train function: the old
+`node in ast.walk(self.train_func)` membership test against the ScopeStack lookup.
+
+    python -m benchmarks.scope [--sizes 100 200 400 800 1600]
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detectors.name_resolver import NameResolver
+from detectors.training_smells_detector import TrainEvalCouplingDetector
+from traversal import ScopeStack, TraversalEngine
+
+
+class WalkMembershipDetector(ast.NodeVisitor):
+    # the detector as it was before the scope stack, reduced to its lookups
+    def __init__(self):
+        self.train_func = None
+        self.found = 0
+
+    def visit_FunctionDef(self, node):
+        if node.name == "train":
+            self.train_func = node
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id in ("evaluate", "EvalCallback"):
+            if self.train_func and node in ast.walk(self.train_func):
+                self.found += 1
+
+    def visit_arguments(self, node):
+        if self.train_func and node in ast.walk(self.train_func):
+            self.found += 1
+
+
+def make_train_function(statements, evaluate_every):
+    lines = ["def train(env, eval_env):"]
+    for i in range(statements):
+        if i % evaluate_every == 0:
+            lines.append("    evaluate(model, eval_env)")
+        else:
+            lines.append(f"    obs, reward, done, info = env.step(model.predict(obs_{i})[0])")
+    return ast.parse("\n".join(lines))
+
+
+def time_detector(tree, make_engine, repeat):
+    best = None
+    for _ in range(repeat):
+        engine = make_engine()
+        start = time.perf_counter()
+        engine.run(tree)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def scope_engine():
+    scope = ScopeStack()
+    names = NameResolver()
+    return TraversalEngine([names, TrainEvalCouplingDetector(scope, names)], scope=scope)
+
+
+def walk_engine():
+    return TraversalEngine([WalkMembershipDetector()])
+
+
+def bare_engine():
+    return TraversalEngine([])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400, 800, 1600])
+    parser.add_argument("--evaluate-every", type=int, default=10, help="one evaluate() call every N statements")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # wall time of a whole traversal: without detector, with the old lookups, with the scope stack
+    print(f"{'statements':>10}{'no detector (s)':>17}{'ast.walk (s)':>15}{'scope stack (s)':>18}{'speedup':>10}")
+    for size in args.sizes:
+        tree = make_train_function(size, args.evaluate_every)
+        bare_time = time_detector(tree, bare_engine, args.repeat)
+        walk_time = time_detector(tree, walk_engine, args.repeat)
+        scope_time = time_detector(tree, scope_engine, args.repeat)
+        print(f"{size:>10}{bare_time:>17.4f}{walk_time:>15.4f}{scope_time:>18.4f}{walk_time / scope_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Benchmark suite on a synthetic corpus (see benchmarks/corpus.py), with JSON baselines.
+
+    python -m benchmarks.suite run [--output FILE] [--files N] [--sizes N ...] [--depth N] [--repeat N]
+    python -m benchmarks.suite compare BASELINE CURRENT [--threshold PERCENT]
+
+`run` measures files/sec of the whole pipeline, of Analyzer and of RLScriptDetector,
+time spent in each detector, peak memory, start-up import time, and scaling curves for Analyzer,
+RLScriptDetector, ProjectReader.list_files and reports_to_dataframe (skipped when
+pandas is not installed). `compare` exits with 1 when a metric got worse than
+BASELINE by more than --threshold percent.
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import Analyzer
+from benchmarks.corpus import generate_rl_script, write_corpus
+from benchmarks.import_time import ENTRY_POINTS, import_seconds
+from model.report import Report
+from pipeline import process_file
+from pre_processing import RLScriptDetector
+from project_reader import ProjectReader
+
+DEFAULT_OUTPUT = os.path.join("./results", "benchmarks", "latest.json")
+DEFAULT_THRESHOLD = 10.0
+
+LOWER_IS_BETTER = "lower"
+HIGHER_IS_BETTER = "higher"
+
+
+class Metrics:
+    def __init__(self):
+        self.values = {}
+        self.skipped = []
+
+    def add(self, name, value, unit, better=LOWER_IS_BETTER):
+        self.values[name] = {"value": value, "unit": unit, "better": better}
+        print(f"{name:<48}{value:>16.6g} {unit}")
+
+    def skip(self, name, reason):
+        self.skipped.append({"name": name, "reason": reason})
+        print(f"{name:<48}{'skipped':>16} ({reason})")
+
+    def to_json(self, settings):
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": settings,
+            "metrics": self.values,
+            "skipped": self.skipped,
+        }
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def parse_all(paths):
+    trees = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            trees.append(ast.parse(file.read(), filename=path))
+    return trees
+
+
+def run_analyzers(trees):
+    for tree in trees:
+        analyzer = Analyzer()
+        analyzer.visit(tree)
+        analyzer.get_report()
+
+
+def run_classifiers(trees):
+    for tree in trees:
+        RLScriptDetector().analyze(tree)
+
+
+def detector_times(trees):
+    # seconds spent in each detector's visit_* handlers, summed over the corpus
+    handler_stats = {}
+    totals = defaultdict(float)
+    for tree in trees:
+        analyzer = Analyzer(handler_stats)
+        analyzer.visit(tree)
+        start = time.perf_counter()
+        analyzer.get_report()
+        totals["get_report"] += time.perf_counter() - start
+    for (detector, _), (seconds, _) in handler_stats.items():
+        totals[detector] += seconds
+    return totals
+
+
+def peak_memory(paths):
+    tracemalloc.start()
+    try:
+        for path in paths:
+            process_file(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_throughput(metrics, paths, trees, repeat):
+    metrics.add("pipeline.files_per_sec", len(paths) / best_time(lambda: [process_file(p) for p in paths], repeat),
+                "files/s", HIGHER_IS_BETTER)
+    rl_trees = [tree for tree in trees if RLScriptDetector().analyze(tree)]
+    metrics.add("analyzer.files_per_sec", len(rl_trees) / best_time(lambda: run_analyzers(rl_trees), repeat),
+                "files/s", HIGHER_IS_BETTER)
+    metrics.add("rl_script_detector.files_per_sec", len(trees) / best_time(lambda: run_classifiers(trees), repeat),
+                "files/s", HIGHER_IS_BETTER)
+    best = {}
+    for _ in range(repeat):
+        for name, seconds in detector_times(rl_trees).items():
+            best[name] = min(seconds, best.get(name, seconds))
+    for name, seconds in sorted(best.items()):
+        metrics.add(f"detector.{name}.seconds", seconds, "s")
+    metrics.add("pipeline.peak_memory", peak_memory(paths), "bytes")
+
+
+def measure_scaling(metrics, sizes, depth, repeat, folder):
+    # one script growing in statements, then projects growing in files / reports
+    for size in sizes:
+        tree = ast.parse(generate_rl_script(size, depth, seed=size))
+        metrics.add(f"scaling.analyzer.{size}_statements", best_time(lambda: run_analyzers([tree]), repeat), "s")
+        metrics.add(f"scaling.rl_script_detector.{size}_statements",
+                    best_time(lambda: run_classifiers([tree]), repeat), "s")
+
+    for size in sizes:
+        project = os.path.join(folder, f"project_{size}")
+        write_corpus(project, files=size, statements=10, depth=1, seed=size)
+        reader = ProjectReader(project)
+        metrics.add(f"scaling.project_reader.{size}_files", best_time(reader.list_files, repeat), "s")
+
+    try:
+        from ui_utils import reports_to_dataframe
+    except ImportError as e:
+        for size in sizes:
+            metrics.skip(f"scaling.reports_to_dataframe.{size}_reports", str(e))
+        return
+    analyzer = Analyzer()
+    analyzer.visit(ast.parse(generate_rl_script(200, depth)))
+    heuristics = [item for sublist in analyzer.get_report() for item in sublist]
+    for size in sizes:
+        reports = [Report(f"train_{i}.py", heuristics) for i in range(size)]
+        metrics.add(f"scaling.reports_to_dataframe.{size}_reports",
+                    best_time(lambda: reports_to_dataframe(reports), repeat), "s")
+
+
+def measure_startup(metrics, repeat):
+    # fresh stdlib-only interpreters, see benchmarks/import_time.py
+    for name, modules in ENTRY_POINTS.items():
+        try:
+            metrics.add(f"startup.{name}.import", import_seconds(modules, repeat), "s")
+        except ImportError as e:
+            metrics.skip(f"startup.{name}.import", f"not importable with the standard library only: {e}")
+
+
+def run(args):
+    metrics = Metrics()
+    measure_startup(metrics, args.repeat)
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_corpus(os.path.join(folder, "corpus"), args.files, args.statements, args.depth, args.seed)
+        trees = parse_all(paths)
+        print(f"{len(paths)} synthetic files, {args.statements} statements, depth {args.depth}\n")
+        measure_throughput(metrics, paths, trees, args.repeat)
+        measure_scaling(metrics, args.sizes, args.depth, args.repeat, folder)
+
+    settings = {key: value for key, value in vars(args).items() if key not in ("command", "output", "handler")}
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(metrics.to_json(settings), file, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+def regressions(baseline, current, threshold):
+    # (name, baseline value, current value, percent worse, regressed) for metrics in both files
+    rows = []
+    for name, old in sorted(baseline["metrics"].items()):
+        new = current["metrics"].get(name)
+        if new is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"] * 100
+        worse = change if old["better"] == LOWER_IS_BETTER else -change
+        rows.append((name, old["value"], new["value"], worse, worse > threshold))
+    return rows
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(args.current, encoding="utf-8") as file:
+        current = json.load(file)
+
+    rows = regressions(baseline, current, args.threshold)
+    print(f"{'metric':<48}{'baseline':>14}{'current':>14}{'worse by':>11}")
+    for name, old, new, worse, regressed in rows:
+        print(f"{name:<48}{old:>14.6g}{new:>14.6g}{worse:>10.1f}%{'  REGRESSION' if regressed else ''}")
+    missing = sorted(set(baseline["metrics"]) - set(current["metrics"]))
+    if missing:
+        print(f"\nNot measured in {args.current}: {', '.join(missing)}")
+
+    regressed = [row[0] for row in rows if row[4]]
+    if regressed:
+        print(f"\n{len(regressed)} metric(s) worse than the baseline by more than {args.threshold}%")
+        return 1
+    print(f"\nNo metric worse than the baseline by more than {args.threshold}%")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="measure and write a JSON baseline")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    run_parser.add_argument("--files", type=int, default=200, help="files in the throughput corpus")
+    run_parser.add_argument("--statements", type=int, default=200, help="statements per training loop")
+    run_parser.add_argument("--depth", type=int, default=3, help="nesting depth of blocks and call chains")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 400, 1600],
+                            help="statements / files / reports for the scaling curves")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help=f"percent a metric may get worse (default: {DEFAULT_THRESHOLD})")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
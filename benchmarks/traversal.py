@@ -0,0 +1,119 @@
+"""
+Compares the fused single-pass traversal with the old per-detector cascade.
+
+    python -m benchmarks.traversal <file or folder> [...] [--repeat N]
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import Analyzer
+from project_reader import ProjectReader, read_source
+from traversal import build_dispatch_table
+
+# detector handlers that did not call generic_visit before the fused engine
+NON_RECURSIVE_HANDLERS = {
+    "HyperparametersSmellsDetector.visit_Assign",
+    "EnvironmentSmellsDetector.visit_Expr",
+}
+# handlers the old Analyzer never forwarded
+UNFORWARDED_HANDLERS = {"AgentSmellsDetector.visit_ClassDef"}
+
+
+class LegacyCascade:
+    # replays the old traversal: Analyzer forwards a node to each detector,
+    # every detector re-walks the subtree on its own, then Analyzer descends again
+    def __init__(self, analyzer):
+        self.nodes_visited = 0
+        self.per_detector = {}
+        self.forwarded = {}
+        for detector in analyzer.engine.detectors:
+            table = build_dispatch_table([detector])
+            self.per_detector[id(detector)] = table
+            for node_type, handlers in table.items():
+                for handler in handlers:
+                    if handler.__qualname__ not in UNFORWARDED_HANDLERS:
+                        self.forwarded.setdefault(node_type, []).append(handler)
+
+    def run(self, node):
+        self.nodes_visited += 1
+        for handler in self.forwarded.get(type(node), ()):
+            handler(node)
+            if handler.__qualname__ not in NON_RECURSIVE_HANDLERS:
+                table = self.per_detector[id(handler.__self__)]
+                for child in ast.iter_child_nodes(node):
+                    self._detector_walk(table, child)
+        for child in ast.iter_child_nodes(node):
+            self.run(child)
+
+    def _detector_walk(self, table, node):
+        self.nodes_visited += 1
+        handlers = table.get(type(node))
+        if handlers:
+            handlers[0](node)
+            if handlers[0].__qualname__ in NON_RECURSIVE_HANDLERS:
+                return
+        for child in ast.iter_child_nodes(node):
+            self._detector_walk(table, child)
+
+
+def collect_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(ProjectReader(path).list_files())
+        else:
+            files.append(path)
+    return files
+
+
+def measure(trees, fused, repeat):
+    best = None
+    nodes = 0
+    for _ in range(repeat):
+        nodes = 0
+        start = time.perf_counter()
+        for tree in trees:
+            analyzer = Analyzer()
+            if fused:
+                nodes += analyzer.engine.run(tree)
+            else:
+                legacy = LegacyCascade(analyzer)
+                legacy.run(tree)
+                nodes += legacy.nodes_visited
+            analyzer.get_report()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return nodes, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=["."])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    trees = []
+    for file_path in collect_files(args.paths):
+        try:
+            trees.append(ast.parse(read_source(file_path)))
+        except SyntaxError:
+            continue
+
+    legacy_nodes, legacy_time = measure(trees, fused=False, repeat=args.repeat)
+    fused_nodes, fused_time = measure(trees, fused=True, repeat=args.repeat)
+
+    print(f"files: {len(trees)}")
+    print(f"{'':10}{'nodes visited':>16}{'wall time (s)':>16}")
+    print(f"{'before':10}{legacy_nodes:>16}{legacy_time:>16.4f}")
+    print(f"{'after':10}{fused_nodes:>16}{fused_time:>16.4f}")
+    if fused_nodes and fused_time:
+        print(f"{'ratio':10}{legacy_nodes / fused_nodes:>15.2f}x{legacy_time / fused_time:>15.2f}x")
+
+
+if __name__ == "__main__":
+    main()
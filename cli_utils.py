@@ -1,19 +1,62 @@
 import json
 import os
 import csv
-from model.heuristic import Heuristic
+from report_writer import REPORT_HEADER
 
 
 def display_banner():
     print("""========================================================================================\nReinforcement Learning Code Analysis Tool\n========================================================================================\n""")
 
-def serialize_heuristics(obj):
-    if isinstance(obj, Heuristic):
-        return {"name": obj.name, "details": obj.details, "line_nr": obj.line_nr, "is_code_smell": obj.is_code_smell}
-    raise TypeError("Type not serializable")
+class RunStats:
+    # counters filled as results stream in, the results themselves are not kept
+    def __init__(self):
+        self.scanned = 0
+        self.prefiltered = 0
+        self.classified_out = 0
+        self.analyzed = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.errors = 0
 
+    def add(self, result):
+        self.scanned += 1
+        if result.error is not None:
+            self.errors += 1
+        if result.rejected_by == "prefilter":
+            self.prefiltered += 1
+        elif result.rejected_by == "classifier":
+            self.classified_out += 1
+        if result.report is not None:
+            self.analyzed += 1
+        if result.cached is True:
+            self.cache_hits += 1
+        elif result.cached is False:
+            self.cache_misses += 1
 
-def get_file_report(report):
+def display_cache_stats(stats):
+    total = stats.cache_hits + stats.cache_misses
+    rate = stats.cache_hits / total * 100 if total else 0
+    print(f"Cache: {stats.cache_hits} hits, {stats.cache_misses} misses ({rate:.1f}% hit rate)")
+
+def display_stage_stats(stats):
+    print(f"Files: {stats.scanned} scanned, {stats.prefiltered} rejected by the byte prefilter, "
+          f"{stats.classified_out} rejected by the AST classifier, {stats.analyzed} analyzed"
+          + (f", {stats.errors} failed" if stats.errors else ""))
+
+def display_profile(summary, n=10):
+    data = summary.to_json()
+    print(f"Profile: {data['files_profiled']} files, parse {data['parse_seconds']:.3f}s, "
+          f"classify {data['classify_seconds']:.3f}s, analysis {data['analysis_seconds']:.3f}s")
+    print(f"{'Detector':<32}{'Method':<20}{'Calls':>10}{'Total (s)':>12}{'Per call (us)':>15}")
+    for row in data["hottest_detectors"][:n]:
+        print(f"{row['Detector']:<32}{row['Method']:<20}{row['Calls']:>10}{row['Total (s)']:>12.4f}"
+              f"{row['Per call (us)']:>15.2f}")
+    print(f"{'Slowest files':<72}{'Total (s)':>12}")
+    for row in data["slowest_files"][:n]:
+        print(f"{row['File'][-72:]:<72}{row['Total (s)']:>12.4f}")
+
+def get_file_report(index):
+    # index is a ReportWriter (or anything with lookup(filename) -> heuristics or None)
     while True:
         if input("Do you want more details on a specific file? (y/n): ").strip().lower() != "y":
             break
@@ -23,10 +66,10 @@ def get_file_report(report):
             if filename.lower() == "exit":
                 return
 
-            file_report = next((r for r in report if r.filename == filename), None)
+            heuristics = index.lookup(filename)
 
-            if file_report:
-                print(json.dumps(file_report.heuristics, default=serialize_heuristics, indent=1))
+            if heuristics:
+                print(json.dumps(heuristics, indent=1))
                 break
             else:
                 retry = input(f"No report found for '{filename}'. Do you want to try another file? (y/n): ").strip().lower()
@@ -39,8 +82,38 @@ def save_report_csv(project_folder_output, rows):
     subdirectory = os.path.join("./results", project_folder_output)
     os.makedirs(subdirectory, exist_ok=True)
 
-    with open(f"./results/{project_folder_output}/report.csv", mode='w', newline='', encoding='utf-8') as csv_file:
+    with open(f"./results/{project_folder_output}/report.csv", mode='w', newline='', encoding='utf-8', errors='surrogateescape') as csv_file:
         writer = csv.writer(csv_file)
-        writer.writerow(["File ", "Heuristic detected", "Details", "Line", "Is code smell?", "Category"])
+        writer.writerow(REPORT_HEADER)
         writer.writerows(rows)
 
+
+def merge_report_csv(project_folder_output, rows, replaced_files):
+    # rows of files in replaced_files (re-analyzed, deleted or renamed) are dropped from
+    # the previous report.csv, the new rows take the place of the first dropped row of
+    # their file or are appended for files the report did not know yet
+    report_path = f"./results/{project_folder_output}/report.csv"
+    previous_rows = []
+    if os.path.isfile(report_path):
+        with open(report_path, newline='', encoding='utf-8', errors='surrogateescape') as csv_file:
+            previous_rows = list(csv.reader(csv_file))[1:]
+    else:
+        print(f"No previous report found at {report_path}, it will only contain the changed files.")
+
+    new_rows_by_file = {}
+    for row in rows:
+        new_rows_by_file.setdefault(row[0], []).append(row)
+
+    replaced_files = set(replaced_files)
+    merged_rows = []
+    for row in previous_rows:
+        file_path = row[0]
+        if file_path not in replaced_files:
+            merged_rows.append(row)
+        elif file_path in new_rows_by_file:
+            merged_rows.extend(new_rows_by_file.pop(file_path))
+    for file_rows in new_rows_by_file.values():
+        merged_rows.extend(file_rows)
+
+    save_report_csv(project_folder_output, merged_rows)
+
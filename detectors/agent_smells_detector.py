@@ -1,6 +1,6 @@
 import ast
-import re
 
+from detectors.pattern_set import PatternSet
 from model.category import Category
 from model.heuristic import Heuristic
 
@@ -10,31 +10,31 @@ random_patterns = [
     r"np\.random\..*",
 ]
 
+# what an act() method returning a random choice calls
+random_action_pattern_set = PatternSet(random_patterns + [r"\.sample\(\)$"])
+
 policy_functions = {"predict", "act", "choose_action", "select_action"}
 
 class AgentSmellsDetector(ast.NodeVisitor):
     def __init__(self):
-        self.action_space_sample_calls = set()
-        self.empty_action_dicts = set()
-        self.policy_based_calls = set()
+        # call nodes, their source is only unparsed if they end up in the report
+        self.action_space_sample_calls = []
+        self.empty_action_dicts = []
+        self.policy_based_calls = []
         self.random_action_calls = []
         self.report = []
 
     def visit_Call(self, node):
-        call_code = ast.unparse(node)
-
         if isinstance(node.func, ast.Attribute) and node.func.attr == "sample":
             if isinstance(node.func.value, ast.Attribute) and node.func.value.attr == "action_space":
-                self.action_space_sample_calls.add((call_code, node.lineno))
+                self.action_space_sample_calls.append(node)
 
         if isinstance(node.func, ast.Attribute) and node.func.attr == "step":
             if node.args and isinstance(node.args[0], ast.Dict) and len(node.args[0].keys) == 0:
-                self.empty_action_dicts.add((call_code, node.lineno))
+                self.empty_action_dicts.append(node)
 
         if isinstance(node.func, ast.Attribute) and node.func.attr in policy_functions:
-            self.policy_based_calls.add((call_code, node.lineno))
-
-        self.generic_visit(node)
+            self.policy_based_calls.append(node)
 
     def visit_ClassDef(self, node):
         for func in node.body:
@@ -44,7 +44,7 @@ class AgentSmellsDetector(ast.NodeVisitor):
                         if isinstance(statement.value, ast.Call):
                             if isinstance(statement.value.func, ast.Attribute):
                                 function_call = ast.unparse(statement.value.func)
-                                if re.search(r"\.sample\(\)$", function_call):
+                                if function_call in random_action_pattern_set:
                                     self.random_action_calls.append({
                                         "class": node.name,
                                         "method": func.name,
@@ -60,11 +60,13 @@ class AgentSmellsDetector(ast.NodeVisitor):
                                             Category.AGENT
                                         ))
 
-        self.generic_visit(node)
+    @staticmethod
+    def unparse_calls(nodes):
+        return sorted({(ast.unparse(node), node.lineno) for node in nodes}, key=lambda c: (c[1], c[0]))
 
     def get_report(self):
         if (self.action_space_sample_calls or self.empty_action_dicts) and not self.policy_based_calls:
-            for call in self.action_space_sample_calls:
+            for call in self.unparse_calls(self.action_space_sample_calls):
                 self.report.append(
                     Heuristic(
                         "Random behavior detected for sampling",
@@ -73,7 +75,7 @@ class AgentSmellsDetector(ast.NodeVisitor):
                         True,
                         Category.AGENT
                     ))
-            for call in self.empty_action_dicts:
+            for call in self.unparse_calls(self.empty_action_dicts):
                 self.report.append(
                     Heuristic(
                         "Random behavior detected for actions",
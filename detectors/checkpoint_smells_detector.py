@@ -1,8 +1,9 @@
 import ast
-import re
 
+from detectors.pattern_set import PatternSet
 from model.category import Category
 from model.heuristic import Heuristic
+from project_index import CHECKPOINT
 
 checkpoint_saving_pattern = r'\b(save|save_checkpoint|self\.saver|save_weights|model_save)\b'
 lib_specific_checkpoint_saving_pattern = r'\b(torch\.save|pickle\.dump|joblib\.dump|model\.save)\b'
@@ -20,22 +21,16 @@ final_save_patterns = [
     r"upload_file_to_artifacts",
 ]
 
+checkpoint_saving_pattern_set = PatternSet([checkpoint_saving_pattern, lib_specific_checkpoint_saving_pattern])
+excluded_checkpoint_pattern_set = PatternSet(excluded_checkpoint_patterns)
+
 class CheckpointSmellsDetector(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, symbols=None):
+        # symbols: project_index.SymbolCollector, told where checkpoints are saved
+        self.symbols = symbols
         self.checkpoint_saving_detected = False
         self.save_calls = []
         self.report = []
-        self.in_loop = False
-
-    def visit_For(self, node):
-        self.in_loop = True
-        self.generic_visit(node)
-        self.in_loop = False
-
-    def visit_While(self, node):
-        self.in_loop = True
-        self.generic_visit(node)
-        self.in_loop = False
 
     def visit_Call(self, node):
         if isinstance(node.func, ast.Attribute):
@@ -45,25 +40,29 @@ class CheckpointSmellsDetector(ast.NodeVisitor):
         else:
             func_name = None
 
-        if func_name and (re.search(checkpoint_saving_pattern, func_name) or re.search(lib_specific_checkpoint_saving_pattern, func_name)):
+        if func_name and func_name in checkpoint_saving_pattern_set:
             self.is_checkpoint_saving(node)
 
-        self.generic_visit(node)
-
     def is_checkpoint_saving(self, node):
         node_code = ast.unparse(node)
-        if any(re.search(pattern, node_code) for pattern in excluded_checkpoint_patterns):
+        if node_code in excluded_checkpoint_pattern_set:
             return
         self.checkpoint_saving_detected = True
         self.save_calls.append(node_code)
+        if self.symbols is not None:
+            self.symbols.add_capability(CHECKPOINT)
 
     def get_report(self):
         if not self.checkpoint_saving_detected:
-            self.report.append(Heuristic(
+            missing = Heuristic(
                 "Missing checkpoint saving",
                 "The model does not implement intermediate checkpoint saving. Training progress could be lost.",
                 None,
                 True,
                 Category.TRAINING
-            ))
+            )
+            self.report.append(missing)
+            if self.symbols is not None:
+                # dropped later when a helper in another module saves, see project_index
+                self.symbols.add_missing(CHECKPOINT, missing)
         return self.report
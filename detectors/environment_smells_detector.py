@@ -24,8 +24,6 @@ class EnvironmentSmellsDetector(ast.NodeVisitor):
                     env_var = node.targets[0].id
                     self.env_assignments[env_var] = node.lineno
 
-        self.generic_visit(node)
-
     def visit_Call(self, node):
         if isinstance(node.func, ast.Name) and node.func.id == "VecVideoRecorder":
             if node.args:
@@ -36,8 +34,6 @@ class EnvironmentSmellsDetector(ast.NodeVisitor):
                     if env_name in self.env_assignments:
                         self.video_recorders.add((env_name, node.lineno, self.env_assignments[env_name]))
 
-        self.generic_visit(node)
-
     def visit_Expr(self, node):
         if isinstance(node.value, ast.Call) and hasattr(node.value.func, 'attr'):
             if node.value.func.attr == "close":
@@ -54,7 +50,7 @@ class EnvironmentSmellsDetector(ast.NodeVisitor):
 
     def get_report(self):
         if self.video_recorders:
-            for env_name, recorder_line, creation_line in self.video_recorders:
+            for env_name, recorder_line, creation_line in sorted(self.video_recorders, key=lambda r: (r[1], r[0])):
                 self.report.append(
                     Heuristic(
                         "Redundant env creation",
@@ -1,8 +1,10 @@
 import ast
-import re
 
+from detectors.name_resolver import NameResolver
+from detectors.pattern_set import PatternSet
 from model.category import Category
 from model.heuristic import Heuristic
+from project_index import EVALUATION
 
 evaluation_patterns = [
             r"^model\.eval$",          # PyTorch evaluation mode
@@ -11,48 +13,47 @@ evaluation_patterns = [
             r"^validation_env\."       # Validation environment usage
         ]
 
+evaluation_pattern_set = PatternSet(evaluation_patterns, fullmatch=True)
+
 class EvaluationSmellsDetector(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, names=None, symbols=None):
+        self.names = names or NameResolver()
+        # symbols: project_index.SymbolCollector, told where evaluation happens
+        self.symbols = symbols
         self.training_loops = []
         self.evaluation_detected = False
         self.evaluation_calls = set()
         self.report = []
 
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Attribute):
-            full_name = f"{ast.unparse(node.func.value)}.{node.func.attr}"
-            if any(re.fullmatch(pattern, full_name) for pattern in evaluation_patterns):
-                self.evaluation_detected = True
-                self.evaluation_calls.add((full_name, node.lineno))
-
-        # for EvalCallback calls
-        elif isinstance(node.func, ast.Name):
-            func_name = node.func.id
-            if func_name == "EvalCallback":
-                self.evaluation_detected = True
-                self.evaluation_calls.add((func_name, node.lineno))
+    def is_eval_callback(self, func):
+        # EvalCallback, also when imported under an alias or called through its module
+        return self.names.refers_to(func, "EvalCallback")
 
-            elif any(re.fullmatch(pattern, func_name) for pattern in evaluation_patterns):
-                self.evaluation_detected = True
-                self.evaluation_calls.add((func_name, node.lineno))
+    def visit_Call(self, node):
+        # evaluation patterns are plain dotted names, other callees can never match
+        func_name = self.names.dotted_name(node.func)
+        if func_name is None:
+            return
 
-        self.generic_visit(node)
+        if self.is_eval_callback(node.func) or func_name in evaluation_pattern_set:
+            self.evaluation_detected = True
+            self.evaluation_calls.add((func_name, node.lineno))
+            if self.symbols is not None:
+                self.symbols.add_capability(EVALUATION)
 
     def visit_Assign(self, node):
         if isinstance(node.value, ast.Call):
             if isinstance(node.value.func, ast.Name):
                 func_name = node.value.func.id
-                if func_name == "EvalCallback":
+                if self.is_eval_callback(node.value.func):
                     self.evaluation_detected = True
                     self.evaluation_calls.add((func_name, node.lineno))
-                elif any(re.fullmatch(pattern, func_name) for pattern in evaluation_patterns):
+                elif func_name in evaluation_pattern_set:
                     self.evaluation_detected = True
                     self.evaluation_calls.add((func_name, node.lineno))
 
-        self.generic_visit(node)
-
     def get_report(self):
-        for call in self.evaluation_calls:
+        for call in sorted(self.evaluation_calls, key=lambda c: (c[1], c[0])):
             self.report.append(Heuristic(
                 "Model evaluation detected",
                 f"Evaluation call '{call[0]}' detected at line {call[1]}",
@@ -61,11 +62,14 @@ class EvaluationSmellsDetector(ast.NodeVisitor):
                 Category.EVALUATION
             ))
         if not self.evaluation_detected:
-            self.report.append(Heuristic(
+            missing = Heuristic(
                 "Missing model evaluation",
                 f"Evaluation call not found in the script",
                 None,
                 True,
                 Category.EVALUATION
-            ))
+            )
+            self.report.append(missing)
+            if self.symbols is not None:
+                self.symbols.add_missing(EVALUATION, missing)
         return self.report
\ No newline at end of file
@@ -1,6 +1,7 @@
 import ast
-import re
 
+from detectors.name_resolver import NameResolver
+from detectors.pattern_set import PatternSet
 from model.category import Category
 from model.heuristic import Heuristic
 
@@ -28,8 +29,13 @@ tuning_function_patterns = [
     r"^bayes_opt\.\w+$"                                 # Matches any function in bayes_opt
 ]
 
+hyperparameter_pattern_set = PatternSet(hyperparameter_patterns)
+tuning_library_pattern_set = PatternSet(tuning_library_patterns)
+tuning_function_pattern_set = PatternSet(tuning_function_patterns)
+
 class HyperparametersSmellsDetector(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, names=None):
+        self.names = names or NameResolver()
         self.hardcoded_hyperparams = []
         self.hyperparameter_tuning = False
         self.found_tuning_imports = []
@@ -39,15 +45,15 @@ class HyperparametersSmellsDetector(ast.NodeVisitor):
     def visit_Assign(self, node):
         for target in node.targets:
             if isinstance(target, ast.Name) and isinstance(node.value, ast.Constant):
-                if any(re.search(pattern, target.id) for pattern in hyperparameter_patterns):
+                if target.id in hyperparameter_pattern_set:
                     self.hardcoded_hyperparams.append((target.id, node.value.value, node.lineno))
             elif isinstance(target, ast.Attribute) and isinstance(node.value, ast.Constant):
-                if any(re.search(pattern, target.attr) for pattern in hyperparameter_patterns):
+                if target.attr in hyperparameter_pattern_set:
                     self.hardcoded_hyperparams.append((target.attr, node.value.value, node.lineno))
 
     def visit_Import(self, node):
         for alias in node.names:
-            if any(re.search(pattern, alias.name) for pattern in tuning_library_patterns):
+            if alias.name in tuning_library_pattern_set:
                 self.found_tuning_imports.append(alias.name)
                 self.report.append(
                     Heuristic(
@@ -57,10 +63,8 @@ class HyperparametersSmellsDetector(ast.NodeVisitor):
                         False,
                     Category.HYPERPARAMETER))
 
-        self.generic_visit(node)
-
     def visit_ImportFrom(self, node):
-        if any(re.search(pattern, node.module or "") for pattern in tuning_library_patterns):
+        if (node.module or "") in tuning_library_pattern_set:
             self.found_tuning_imports.append(node.module)
             self.report.append(Heuristic(
                 "Tuning",
@@ -68,29 +72,17 @@ class HyperparametersSmellsDetector(ast.NodeVisitor):
                 node.lineno, False,
                 Category.HYPERPARAMETER))
 
-        self.generic_visit(node)
-
     def visit_Call(self, node):
-        if isinstance(node.func, ast.Attribute):
-            func_name = f"{ast.unparse(node.func.value)}.{node.func.attr}"
-            if any(re.search(pattern, func_name) for pattern in tuning_function_patterns):
-                self.found_tuning_usage.append(func_name)
-                self.report.append(Heuristic(
-                    "Tuning",
-                    f"Tuning function '{func_name}' used at line {node.lineno}",
-                    node.lineno, False,
-                    Category.HYPERPARAMETER))
-
-        elif isinstance(node.func, ast.Name):
-            func_name = node.func.id
-            if any(re.search(pattern, func_name) for pattern in tuning_function_patterns):
+        # tuning patterns are plain dotted names, other callees can never match
+        func_name = self.names.dotted_name(node.func)
+        if func_name is not None:
+            if func_name in tuning_function_pattern_set or self.names.qualified_name(node.func) in tuning_function_pattern_set:
                 self.found_tuning_usage.append(func_name)
                 self.report.append(Heuristic(
                     "Tuning",
                     f"Tuning function '{func_name}' used at line {node.lineno}",
                     node.lineno, False,
                     Category.HYPERPARAMETER))
-        self.generic_visit(node)
 
     def generate_report(self):
         if self.hardcoded_hyperparams:
@@ -1,7 +1,9 @@
 import ast
 
+from detectors.name_resolver import NameResolver
 from model.category import Category
 from model.heuristic import Heuristic
+from project_index import LOGGING
 
 logging_libraries = {
     "logging", "loguru", "stable_baselines3.common.logger", "ray.tune.logger"
@@ -12,7 +14,10 @@ logging_methods = {
         }
 
 class LoggingDetector(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, names=None, symbols=None):
+        self.names = names or NameResolver()
+        # symbols: project_index.SymbolCollector, told where logging happens
+        self.symbols = symbols
         self.logging_imports = set()
         self.logger_initialization = set()
         self.logging_calls = set()
@@ -31,7 +36,6 @@ class LoggingDetector(ast.NodeVisitor):
                         False,
                         Category.CODESTYLE
                     ))
-        self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
         if node.module and node.module in logging_libraries:
@@ -45,13 +49,11 @@ class LoggingDetector(ast.NodeVisitor):
                     Category.CODESTYLE
                 ))
 
-        self.generic_visit(node)
-
     def visit_Call(self, node):
         if isinstance(node.func, ast.Attribute):
             method_name = node.func.attr
             if method_name in logging_methods:
-                func_name = f"{ast.unparse(node.func.value)}.{method_name}"
+                func_name = self.names.dotted_name(node.func) or f"{ast.unparse(node.func.value)}.{method_name}"
                 self.logging_calls.add(func_name)
                 self.report.append(
                     Heuristic(
@@ -62,16 +64,19 @@ class LoggingDetector(ast.NodeVisitor):
                         Category.CODESTYLE
                     ))
                 self.logging_detected = True
-        self.generic_visit(node)
+                if self.symbols is not None:
+                    self.symbols.add_capability(LOGGING)
 
     def get_report(self):
         if not self.logging_detected:
-            self.report.append(
-                Heuristic(
-                    "Logging",
-                    "No logging detected",
-                    None,
-                    True,
-                    Category.CODESTYLE
-                ))
+            missing = Heuristic(
+                "Logging",
+                "No logging detected",
+                None,
+                True,
+                Category.CODESTYLE
+            )
+            self.report.append(missing)
+            if self.symbols is not None:
+                self.symbols.add_missing(LOGGING, missing)
         return self.report
@@ -0,0 +1,56 @@
+import ast
+
+
+class NameResolver(ast.NodeVisitor):
+    # Per-file dotted names for Name/Attribute chains, computed once per node and shared
+    # by every detector. It sits in the traversal like a detector so it sees the imports
+    # before the calls that use them, and qualified_name() expands the aliases they bind.
+    def __init__(self):
+        self.aliases = {}
+        self._dotted_names = {}
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            # a plain `import a.b` binds `a` to itself, only `as` needs an entry
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+
+    def visit_ImportFrom(self, node):
+        if node.module and not node.level:
+            for alias in node.names:
+                if alias.name != "*":
+                    self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def dotted_name(self, node):
+        # "a.b.c" as written, None when the chain contains anything else (calls, subscripts...)
+        try:
+            return self._dotted_names[node]
+        except KeyError:
+            pass
+        if isinstance(node, ast.Name):
+            name = node.id
+        elif isinstance(node, ast.Attribute):
+            value = self.dotted_name(node.value)
+            name = f"{value}.{node.attr}" if value is not None else None
+        else:
+            name = None
+        self._dotted_names[node] = name
+        return name
+
+    def qualified_name(self, node):
+        # dotted_name with its first part replaced by what an import bound it to,
+        # e.g. sb3.PPO -> stable_baselines3.PPO after `import stable_baselines3 as sb3`
+        name = self.dotted_name(node)
+        if name is None:
+            return None
+        head, separator, rest = name.partition(".")
+        target = self.aliases.get(head)
+        if target is None:
+            return name
+        return target + separator + rest
+
+    def refers_to(self, node, name):
+        # whether node names the class or function `name`, also when it was imported
+        # under an alias or is called through its module, e.g. callbacks.EvalCallback
+        qualified_name = self.qualified_name(node)
+        return qualified_name is not None and qualified_name.rsplit(".", 1)[-1] == name
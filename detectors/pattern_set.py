@@ -0,0 +1,30 @@
+import re
+from functools import lru_cache
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class PatternSet:
+    # A list of regexes compiled into one alternation. match(text) gives the pattern that
+    # matched (or None) with the semantics of any(re.search(p, text) for p in patterns),
+    # or re.fullmatch when fullmatch=True. Results are memoized per text, identifiers
+    # repeat a lot across a codebase.
+    def __init__(self, patterns, fullmatch=False, flags=0, cache_size=DEFAULT_CACHE_SIZE):
+        self.patterns = list(patterns)
+        # each alternative gets its own named group; it closes after any group of the
+        # pattern itself, so lastgroup always names the alternative that matched
+        self.regex = re.compile(
+            "|".join(f"(?P<p{index}>{pattern})" for index, pattern in enumerate(self.patterns)) or "(?!)",
+            flags
+        )
+        self._find = self.regex.fullmatch if fullmatch else self.regex.search
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, text):
+        found = self._find(text)
+        if found is None:
+            return None
+        return self.patterns[int(found.lastgroup[1:])]
+
+    def __contains__(self, text):
+        return self.match(text) is not None
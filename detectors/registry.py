@@ -0,0 +1,83 @@
+import importlib
+
+from model.category import Category
+
+
+class DetectorSpec:
+    # What Analyzer needs to build a detector, without importing its module:
+    # needs lists the shared helpers its constructor takes ("names" for the
+    # NameResolver, "scope" for the ScopeStack, "symbols" for the
+    # project_index.SymbolCollector), report is the method (or list attribute)
+    # holding its findings after the walk.
+    def __init__(self, name, module, class_name, category, needs=(), report="get_report"):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.category = category
+        self.needs = needs
+        self.report = report
+
+    def load(self):
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+
+# report order of a full run
+DETECTORS = [
+    DetectorSpec("environment", "detectors.environment_smells_detector", "EnvironmentSmellsDetector",
+                 Category.ENVIRONMENT),
+    DetectorSpec("checkpoint", "detectors.checkpoint_smells_detector", "CheckpointSmellsDetector",
+                 Category.TRAINING, needs=("symbols",)),
+    DetectorSpec("hyperparameter", "detectors.hyperaparmeters_smells_detector", "HyperparametersSmellsDetector",
+                 Category.HYPERPARAMETER, needs=("names",), report="generate_report"),
+    DetectorSpec("evaluation", "detectors.evaluation_smells_detector", "EvaluationSmellsDetector",
+                 Category.EVALUATION, needs=("names", "symbols")),
+    DetectorSpec("logging", "detectors.logging_detector", "LoggingDetector",
+                 Category.CODESTYLE, needs=("names", "symbols")),
+    DetectorSpec("initialization", "detectors.initialization_smells_detector", "InitializationSmellsDetector",
+                 Category.AGENT),
+    DetectorSpec("agent", "detectors.agent_smells_detector", "AgentSmellsDetector",
+                 Category.AGENT),
+    DetectorSpec("training", "detectors.training_smells_detector", "TrainEvalCouplingDetector",
+                 Category.TRAINING, needs=("scope", "names"), report="report"),
+]
+DETECTORS_BY_NAME = {spec.name: spec for spec in DETECTORS}
+# detectors whose "missing" findings the project index can resolve across modules
+INDEXED_DETECTORS = tuple(spec.name for spec in DETECTORS if "symbols" in spec.needs)
+
+
+def select_detectors(only):
+    # "HYPERPARAMETER,TRAINING" or "checkpoint,logging" (categories and detector names
+    # can be mixed, case does not matter) to the selected detector names in report
+    # order; None or "" selects all. ValueError names the valid choices.
+    if not only:
+        return None
+    wanted = set()
+    for token in only.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        if token.upper() in Category.__members__:
+            category = Category[token.upper()]
+            wanted.update(spec.name for spec in DETECTORS if spec.category is category)
+        elif token.lower() in DETECTORS_BY_NAME:
+            wanted.add(token.lower())
+        else:
+            choices = ", ".join(list(Category.__members__) + list(DETECTORS_BY_NAME))
+            raise ValueError(f"Unknown detector or category {token!r}, choose from {choices}")
+    if not wanted:
+        raise ValueError("No detector selected")
+    return tuple(spec.name for spec in DETECTORS if spec.name in wanted)
+
+
+def indexed_detectors(detectors=None):
+    # the INDEXED_DETECTORS among a selection, () when the index has nothing to do
+    if detectors is None:
+        return INDEXED_DETECTORS
+    return tuple(name for name in detectors if name in INDEXED_DETECTORS)
+
+
+def detector_specs(detectors=None):
+    # specs of the selected detector names (as returned by select_detectors), all for None
+    if detectors is None:
+        return DETECTORS
+    return [DETECTORS_BY_NAME[name] for name in detectors]
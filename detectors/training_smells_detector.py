@@ -1,62 +1,65 @@
 import ast
 
+from detectors.name_resolver import NameResolver
 from model.category import Category
 from model.heuristic import Heuristic
+from traversal import ScopeStack
 
 
 class TrainEvalCouplingDetector(ast.NodeVisitor):
-    def __init__(self):
-        self.train_func = None
-        self.eval_func = None
+    def __init__(self, scope=None, names=None):
+        self.scope = scope if scope is not None else ScopeStack()
+        self.names = names or NameResolver()
         self.train_calls_eval = False
         self.train_uses_eval_env = False
         self.eval_callback_used = False
         self.report = []
 
-    def visit_FunctionDef(self, node):
-        if node.name == "train":
-            self.train_func = node
-        elif node.name == "evaluate":
-            self.eval_func = node
-        self.generic_visit(node)
+    @staticmethod
+    def is_evaluate_call(func):
+        # evaluate() or, from a method, self.evaluate()
+        if isinstance(func, ast.Name):
+            return func.id == "evaluate"
+        return (isinstance(func, ast.Attribute) and func.attr == "evaluate"
+                and isinstance(func.value, ast.Name) and func.value.id in ("self", "cls"))
 
     def visit_Call(self, node):
-        if isinstance(node.func, ast.Name):
-            if node.func.id == "evaluate" and self.train_func and node in ast.walk(self.train_func):
-                self.train_calls_eval = True
-                self.report.append(
-                    Heuristic(
+        if self.scope.enclosing_function("train") is None:
+            return
+
+        if self.is_evaluate_call(node.func):
+            self.train_calls_eval = True
+            self.report.append(
+                Heuristic(
+                "Training and evaluation coupling",
+                "Training function calls 'evaluate()'",
+                node.lineno,
+                True,
+                Category.TRAINING
+            ))
+
+        # the same check as EvaluationSmellsDetector.is_eval_callback
+        if self.names.refers_to(node.func, "EvalCallback"):
+            self.eval_callback_used = True
+            self.report.append(
+                Heuristic(
                     "Training and evaluation coupling",
-                    "Training function calls 'evaluate()'",
+                    "'EvalCallback' is used inside training",
                     node.lineno,
                     True,
                     Category.TRAINING
                 ))
 
-            if node.func.id == "EvalCallback" and self.train_func and node in ast.walk(self.train_func):
-                self.eval_callback_used = True
-                self.report.append(
-                    Heuristic(
-                        "Training and evaluation coupling",
-                        "'EvalCallback' is used inside training",
-                        node.lineno,
-                        True,
-                        Category.TRAINING
-                    ))
-
-        self.generic_visit(node)
-
     def visit_arguments(self, node):
-        if self.train_func and node in ast.walk(self.train_func):
+        train_func = self.scope.enclosing_function("train")
+        if train_func is not None:
             for arg in node.args:
                 if arg.arg in ["envs_eval", "eval_env", "evaluation_envs"]:
                     self.train_uses_eval_env = True
                     self.report.append(Heuristic(
                         "Training and evaluation coupling",
                         f"Training function takes evaluation environments as argument: '{arg.arg}'",
-                        self.train_func.lineno,
+                        train_func.lineno,
                         True,
                         Category.TRAINING
                     ))
-
-        self.generic_visit(node)
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+from itertools import islice
+
+from analyzer import Analyzer
+from model.file_error import ANALYSIS, FileError
+from model.file_result import FileResult
+from pipeline import process_file, process_source
+from result_cache import ResultCache
+
+CHUNKS_PER_WORKER = 4
+MAX_CHUNK_SIZE = 32
+REORDER_WINDOW = 512
+
+# per-process cache connection, opened by the pool initializer or by a serial run
+_cache = None
+_profile = False
+_detectors = None
+
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+
+def analyze_file(file_path, cache=None, profile=False, detectors=None):
+    try:
+        return process_file(file_path, cache, profile, detectors)
+    except Exception as e:
+        return FileResult(file_path, None, error=FileError.from_exception(ANALYSIS, e))
+
+
+def analyze_source(source, cache=None, profile=False, detectors=None):
+    # source is (path, data, cache key or None), see analyze_sources
+    file_path, data, key = source
+    if isinstance(data, FileError):
+        return FileResult(file_path, None, error=data)
+    try:
+        return process_source(file_path, data, cache, profile, key, detectors)
+    except Exception as e:
+        return FileResult(file_path, None, error=FileError.from_exception(ANALYSIS, e))
+
+
+def _warm_up(cache_path, profile, detectors):
+    # import and build the detectors once per worker instead of on the first file
+    global _cache, _profile, _detectors
+    Analyzer(detectors=detectors)
+    _profile = profile
+    _detectors = detectors
+    if cache_path is not None:
+        _cache = ResultCache(cache_path, detectors=detectors)
+
+
+def _analyze_chunk(chunk):
+    return [(index, analyze_file(file_path, _cache, _profile, _detectors)) for index, file_path in chunk]
+
+
+def _analyze_source_chunk(chunk):
+    return [(index, analyze_source(source, _cache, _profile, _detectors)) for index, source in chunk]
+
+
+def _file_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+def _source_size(source):
+    return 0 if isinstance(source[1], FileError) else len(source[1])
+
+
+def _largest_first_chunks(indexed_items, jobs, size=_file_size):
+    indexed = sorted(indexed_items, key=lambda item: size(item[1]), reverse=True)
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(indexed) // (jobs * CHUNKS_PER_WORKER)))
+    return [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+
+
+def _evict(cache_path, detectors):
+    cache = ResultCache(cache_path, detectors=detectors)
+    cache.evict()
+    cache.close()
+
+
+def analyze_files(file_paths, jobs=None, cache_path=None, profile=False, detectors=None):
+    # yields one FileResult per path in the order of file_paths, whatever the
+    # number of jobs, so serial and parallel output are identical; with profile
+    # every parsed file carries its timings on FileResult.profile; detectors limits
+    # the analysis, see detectors.registry.select_detectors
+    return _analyze_ordered(file_paths, jobs, cache_path, profile, detectors, analyze_file, _analyze_chunk,
+                            _file_size)
+
+
+def analyze_sources(sources, jobs=None, cache_path=None, profile=False, detectors=None):
+    # like analyze_files for contents already in memory: sources yields (path, data,
+    # key), key being a ready-made cache key (e.g. a git blob SHA) or None to hash
+    # data, and data a FileError for a file that could not be read. The iterable is
+    # consumed a window at a time, so a lazy reader never holds more than two windows
+    # of contents.
+    return _analyze_ordered(sources, jobs, cache_path, profile, detectors, analyze_source, _analyze_source_chunk,
+                            _source_size)
+
+
+def _analyze_ordered(items, jobs, cache_path, profile, detectors, analyze_one, analyze_chunk, size):
+    items = iter(items)
+    jobs = jobs or default_jobs()
+    # a single item is not worth starting a pool for
+    head = list(islice(items, 2))
+    if jobs == 1 or len(head) < 2:
+        cache = ResultCache(cache_path, detectors=detectors) if cache_path is not None else None
+        try:
+            for item in head:
+                yield analyze_one(item, cache, profile, detectors)
+            for item in items:
+                yield analyze_one(item, cache, profile, detectors)
+        finally:
+            if cache is not None:
+                cache.evict()
+                cache.close()
+        return
+
+    # multiprocessing is only imported by runs that use it, a serial run starts faster
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # Items are scheduled largest first inside windows of REORDER_WINDOW items and at
+    # most two windows are in flight, so results waiting for an earlier, slower file
+    # never hold more than two windows in memory.
+    indexed = enumerate(head + list(islice(items, REORDER_WINDOW - len(head))))
+    indexed_rest = enumerate(items, REORDER_WINDOW)
+    pending = {}
+    next_index = 0
+    futures = set()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_up, initargs=(cache_path, profile, detectors)) as pool:
+        def submit_window(window):
+            futures.update(pool.submit(analyze_chunk, chunk) for chunk in _largest_first_chunks(window, jobs, size))
+            return len(window) == REORDER_WINDOW
+
+        more = submit_window(list(indexed))
+        if more:
+            more = submit_window(list(islice(indexed_rest, REORDER_WINDOW)))
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                pending.update(future.result())
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+                if next_index % REORDER_WINDOW == 0 and more:
+                    more = submit_window(list(islice(indexed_rest, REORDER_WINDOW)))
+
+    if cache_path is not None:
+        _evict(cache_path, detectors)
@@ -1,36 +1,211 @@
-import requests
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
-# name is not great but I didn't have better ideas..
+import requests
+from requests.adapters import HTTPAdapter
 
-def get_repo_last_update(repo_url: str) -> Optional[int]:
-    try:
-        parts = repo_url.rstrip('/').split('/')
-        if len(parts) < 2:
-            return None
+GITHUB_API_URL = "https://api.github.com"
+DEFAULT_METADATA_CACHE_PATH = os.path.join("./results", ".cache", "github.sqlite3")
+# (connect, read) seconds, a stalled connection fails instead of hanging the run
+DEFAULT_TIMEOUT = (5, 15)
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+# longest wait for a rate limit reset before giving up on a request
+MAX_RATE_LIMIT_WAIT = 60
+BULK_WORKERS = 8
+
+
+class RateLimited(Exception):
+    def __init__(self, reset_at):
+        super().__init__(f"GitHub API rate limit exceeded until {time.ctime(reset_at)}")
+        self.reset_at = reset_at
+
+
+def parse_repo_url(repo_url):
+    # (owner, repo) of https://github.com/owner/repo[.git][/], None if there are not two parts
+    parts = repo_url.rstrip('/').split('/')
+    if len(parts) < 2:
+        return None
+    repo = parts[-1]
+    return parts[-2], repo[:-len(".git")] if repo.endswith(".git") else repo
+
+
+class ETagCache:
+    # response bodies by URL with their ETag, replayed when GitHub answers 304
+    def __init__(self, path=DEFAULT_METADATA_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # shared by the bulk API's threads, guarded by the lock
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " etag TEXT NOT NULL,"
+                " body TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            self.connection.commit()
+
+    def get(self, url):
+        # (etag, body) or None
+        with self.lock:
+            return self.connection.execute("SELECT etag, body FROM responses WHERE url = ?", (url,)).fetchone()
+
+    def put(self, url, etag, body):
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                                    (url, etag, body, time.time()))
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class GitHubClient:
+    # One pooled session for every request, strict timeouts, conditional requests
+    # (a 304 does not count against the rate limit) and waiting for X-RateLimit-Reset
+    # when the budget is spent. base_url can point at a local stub server.
+    def __init__(self, base_url=GITHUB_API_URL, cache_path=DEFAULT_METADATA_CACHE_PATH, token=None,
+                 timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, max_rate_limit_wait=MAX_RATE_LIMIT_WAIT,
+                 pool_size=BULK_WORKERS):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.cache = ETagCache(cache_path) if cache_path is not None else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        token = token or os.environ.get("GITHUB_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        # epoch seconds until which the API said no requests are left
+        self.rate_limit_reset = 0.0
+        self._rate_limit_lock = threading.Lock()
 
-        owner = parts[-2]
-        repo = parts[-1].replace('.git', '')
+    def _wait_for_rate_limit(self):
+        with self._rate_limit_lock:
+            wait = self.rate_limit_reset - time.time()
+        if wait > self.max_rate_limit_wait:
+            raise RateLimited(self.rate_limit_reset)
+        if wait > 0:
+            time.sleep(wait)
 
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-        response = requests.get(api_url, params={'per_page': 1})
+    def _note_rate_limit(self, response):
+        # remember the reset time once the budget is used up, so other threads wait too
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        retry_after = response.headers.get("Retry-After")
+        reset_at = None
+        if retry_after is not None and retry_after.isdigit():
+            reset_at = time.time() + int(retry_after)
+        elif remaining == "0" and reset is not None and reset.isdigit():
+            reset_at = float(reset)
+        if reset_at is not None:
+            with self._rate_limit_lock:
+                self.rate_limit_reset = max(self.rate_limit_reset, reset_at)
+        return reset_at
 
-        if response.status_code != 200:
+    def get_json(self, path, params=None):
+        # parsed JSON body of a 200 (or the cached body on 304), None for other answers
+        url = requests.Request("GET", self.base_url + path, params=params).prepare().url
+        cached = self.cache.get(url) if self.cache is not None else None
+        headers = {"If-None-Match": cached[0]} if cached is not None else {}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._wait_for_rate_limit()
+            except RateLimited:
+                # a stale answer beats none while the budget is spent
+                if cached is not None:
+                    return json.loads(cached[1])
+                raise
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+                continue
+
+            reset_at = self._note_rate_limit(response)
+            if response.status_code == 304 and cached is not None:
+                return json.loads(cached[1])
+            if response.status_code == 200:
+                if self.cache is not None and response.headers.get("ETag"):
+                    self.cache.put(url, response.headers["ETag"], response.text)
+                return response.json()
+            if response.status_code in (403, 429) and reset_at is not None:
+                continue
+            if response.status_code >= 500 and attempt < self.max_retries:
+                time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+                continue
             return None
+        return None
 
-        commits = response.json()
+    def last_commit_date(self, repo_url) -> Optional[datetime]:
+        owner_repo = parse_repo_url(repo_url)
+        if owner_repo is None:
+            return None
+        commits = self.get_json(f"/repos/{owner_repo[0]}/{owner_repo[1]}/commits", {"per_page": 1})
         if not commits:
             return None
+        return datetime.fromisoformat(commits[0]['commit']['committer']['date'].replace('Z', '+00:00'))
+
+    def repo_age_days(self, repo_url) -> Optional[int]:
+        # days since the last commit, None when GitHub cannot tell
+        try:
+            last_commit_date = self.last_commit_date(repo_url)
+        except Exception as e:
+            print(f"Error fetching repository age: {e}")
+            return None
+        if last_commit_date is None:
+            return None
+        return (datetime.now(timezone.utc) - last_commit_date).days
+
+    def repo_ages_days(self, repo_urls: Iterable[str], max_workers=BULK_WORKERS) -> Dict[str, Optional[int]]:
+        # bulk repo_age_days, the threads share the session's connection pool
+        repo_urls = list(dict.fromkeys(repo_urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(repo_urls, pool.map(self.repo_age_days, repo_urls)))
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
 
-        last_commit_date_str = commits[0]['commit']['committer']['date']
-        last_commit_date = datetime.fromisoformat(last_commit_date_str.replace('Z', '+00:00'))
+    def __enter__(self):
+        return self
 
-        now = datetime.now(timezone.utc)
-        age_days = (now - last_commit_date).days
+    def __exit__(self, *exc_info):
+        self.close()
 
-        return age_days
 
-    except Exception as e:
-        print(f"Error fetching repository age: {e}")
-        return None
\ No newline at end of file
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> GitHubClient:
+    # one client per process, so every caller shares its pool and cache
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = GitHubClient()
+        return _default_client
+
+
+# name is not great but I didn't have better ideas..
+
+def get_repo_last_update(repo_url: str) -> Optional[int]:
+    return default_client().repo_age_days(repo_url)
@@ -0,0 +1,95 @@
+import os
+import re
+
+GITIGNORE_FILENAME = ".gitignore"
+
+
+def _translate(pattern):
+    # gitignore glob to a regex body: * and ? stop at "/", ** crosses directories
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    # The patterns of one .gitignore (or an exclude list in the same syntax), matched
+    # against paths relative to the folder the file lives in. Last matching pattern
+    # wins, "!" re-includes, a trailing "/" only matches directories and a pattern
+    # with a "/" before its end is anchored to the folder.
+    def __init__(self, patterns):
+        self.rules = []
+        for line in patterns:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            body = _translate(line.lstrip("/"))
+            regex = re.compile(("" if anchored else "(?:.*/)?") + body + r"\Z")
+            self.rules.append((regex, negated, dir_only))
+
+    @classmethod
+    def from_file(cls, path):
+        # None when the file cannot be read, as git does
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as file:
+                return cls(file.readlines())
+        except OSError:
+            return None
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def match(self, relative_path, is_dir):
+        # True ignored, False re-included, None when no pattern matches
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative_path):
+                return not negated
+        return None
+
+
+def load_rules(folder):
+    # the .gitignore of folder, None when it has none or it is empty
+    rules = IgnoreRules.from_file(os.path.join(folder, GITIGNORE_FILENAME))
+    return rules or None
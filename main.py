@@ -1,17 +1,21 @@
-import ast
+import argparse
 import os
 import sys
-from typing import List
 
-from cli_utils import display_banner, save_report_csv, get_file_report
-from model.heuristic import Heuristic
-from model.report import Report
-from pre_processing import RLScriptDetector
-from project_reader import ProjectReader, read_file
-from analyzer import Analyzer
-import openai
+from cli_utils import RunStats, display_banner, display_cache_stats, display_profile, display_stage_stats, merge_report_csv, get_file_report
+from detectors.registry import indexed_detectors, select_detectors
+from executor import analyze_files, default_jobs
+from pipeline import index_file
+from report_writer import ReportWriter
+from result_cache import DEFAULT_CACHE_PATH
+from profiler import ProfileSummary
+from project_index import ProjectIndex, resolve_results
+from project_reader import ProjectReader
 #
 # def analyze_with_llm(code: str) -> str:
+#     # imported here so the analysis never waits for the openai package
+#     import openai
+#
 #     prompt = f"""
 #     Analyze this RL-related code for any code smells and suggest improvements.
 #
@@ -31,44 +35,102 @@ import openai
 #     return response['choices'][0]['message']['content']
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reinforcement Learning Code Analysis Tool")
+    parser.add_argument("--jobs", type=int, default=default_jobs(),
+                        help="number of worker processes (default: number of CPUs, 1 runs serially)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"analyze every file again instead of reusing results from {DEFAULT_CACHE_PATH}")
+    parser.add_argument("--base", help="only analyze .py files changed since this git revision "
+                                       "and merge them into the previous report.csv")
+    parser.add_argument("--head", default="HEAD", help="revision compared with --base (default: HEAD)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                        help="skip files and folders matching this .gitignore-style pattern (repeatable)")
+    parser.add_argument("--only", metavar="DETECTORS",
+                        help="comma-separated categories or detectors to run, e.g. HYPERPARAMETER,TRAINING "
+                             "(default: all)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every detector and file and write profile.json next to report.csv "
+                             "(files answered from the cache are not timed, add --no-cache to time all)")
+    args = parser.parse_args()
+    try:
+        detectors = select_detectors(args.only)
+    except ValueError as e:
+        parser.error(str(e))
+
     display_banner()
     while True:
         welcome_prompt = input("Do you want to analyze a new project? (y/n) ")
         if welcome_prompt == "y":
             folder_path = input("Enter the path to the project folder: ")
             try:
-                reader = ProjectReader(folder_path)
+                reader = ProjectReader(folder_path, args.exclude)
                 folder_name = os.path.basename(folder_path)
-                file_paths = reader.list_files()
-                report = []
+                if args.base:
+                    file_paths, removed_paths = reader.list_changed_files(args.base, args.head)
+                    print(f"{len(file_paths)} changed and {len(removed_paths)} removed files between {args.base} and {args.head}")
+                else:
+                    # analysis starts with the first file found
+                    file_paths = reader.walk_files()
+                # rows are only kept for merging a --base run, a full run streams them to disk
                 rows = []
-                detected_heuristics:List[Heuristic] = []
-                for file_path in file_paths:
-                    filename = os.path.basename(file_path)
-                    rl_detector = RLScriptDetector()
-                    if rl_detector.analyze(file_path):
-                        tree = ast.parse(read_file(file_path))
-                        analyzer = Analyzer()
-                        analyzer.visit(tree)
-                        print("------ Analyzing file ------ {}".format(file_path))
+                stats = RunStats()
+                profile_summary = ProfileSummary() if args.profile else None
+                cache_path = None if args.no_cache else DEFAULT_CACHE_PATH
+                with ReportWriter(folder_name, write_csv=not args.base, merge=bool(args.base)) as report_writer:
+                    results = analyze_files(file_paths, args.jobs, cache_path, args.profile, detectors)
+                    # "missing" findings are checked against helpers in other modules of the project
+                    # once every file is in the index; a --base run updates the index of the previous
+                    # run with the changed files
+                    index = None
+                    if indexed_detectors(detectors):
+                        def index_module(path):
+                            return index_file(path, detectors)
 
-                        detected_heuristics = [item for sublist in analyzer.get_report() for item in sublist]
-                        report.append(Report(filename, detected_heuristics))
+                        if args.base:
+                            index = ProjectIndex.load(report_writer.folder, folder_path, index_module)
+                            for path in file_paths + removed_paths:
+                                index.remove(path)
+                        else:
+                            index = ProjectIndex(folder_path, index_module)
+                        results = resolve_results(results, index)
+                    for result in results:
+                        stats.add(result)
+                        if result.profile is not None:
+                            profile_summary.add(result.profile)
+                        file_path, file_report = result.path, result.report
+                        if result.error is not None:
+                            print(f"Error analyzing {file_path}: {result.error}")
+                        elif file_report is not None:
+                            print("------ Analyzing file ------ {}".format(file_path))
 
-                        # if len(detected_heuristics) != 0:
-                        # if filename == "atari.py":
-                        #     code = read_file(file_path)
-                        #     llm_feedback = analyze_with_llm(code)
-                        #     print("LLM Feedback:\n", llm_feedback)
+                            # if len(detected_heuristics) != 0:
+                            # if filename == "atari.py":
+                            #     code = read_file(file_path)
+                            #     llm_feedback = analyze_with_llm(code)
+                            #     print("LLM Feedback:\n", llm_feedback)
 
-                        for i in detected_heuristics:
-                            rows.append((file_path, i.name, i.details, i.line_nr, i.is_code_smell, i.category))
+                            file_rows = report_writer.write(file_path, file_report)
+                            if args.base:
+                                rows.extend(file_rows)
 
-                print(f"Analysis finished. The full report can be found in ./results/{folder_name}")
+                if args.base:
+                    merge_report_csv(folder_name, rows, file_paths + removed_paths)
+                    report_writer.merge(file_paths + removed_paths)
+                if index is not None:
+                    # every file's "missing" findings as the whole project resolves them now,
+                    # including unchanged files of a --base run that reach a changed helper
+                    report_writer.correct(index.corrections())
+                    index.save(report_writer.folder)
 
-                save_report_csv(folder_name, rows)
+                print(f"Analysis finished. The full report can be found in ./results/{folder_name}")
+                display_stage_stats(stats)
+                if cache_path is not None:
+                    display_cache_stats(stats)
+                if profile_summary is not None:
+                    display_profile(profile_summary)
+                    print(f"Profile written to {profile_summary.write(report_writer.folder)}")
 
-                get_file_report(report)
+                get_file_report(report_writer)
             except ValueError as e:
                 print(e)
         elif welcome_prompt == "n":
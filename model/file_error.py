@@ -0,0 +1,24 @@
+# stage a file failed in, see FileError.stage
+READ = "read"
+PARSE = "parse"
+ANALYSIS = "analysis"
+
+
+class FileError:
+    # why a file has no result: travels back from the worker on FileResult.error
+    # instead of the failure being passed on as if it were file content
+    def __init__(self, stage, kind, message, line=None):
+        self.stage = stage
+        self.kind = kind
+        self.message = message
+        self.line = line
+
+    @classmethod
+    def from_exception(cls, stage, e):
+        if isinstance(e, SyntaxError):
+            return cls(stage, type(e).__name__, e.msg, e.lineno)
+        return cls(stage, type(e).__name__, str(e))
+
+    def __str__(self):
+        where = f" (line {self.line})" if self.line is not None else ""
+        return f"{self.stage} error, {self.kind}: {self.message}{where}"
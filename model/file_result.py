@@ -0,0 +1,17 @@
+from typing import Optional
+
+from model.report import Report
+
+
+class FileResult:
+    def __init__(self, path, report: Optional[Report], error=None, cached=None, rejected_by=None, profile=None,
+                 symbols=None):
+        self.path = path
+        self.report = report
+        self.error = error
+        self.cached = cached
+        self.rejected_by = rejected_by
+        # profiler.FileProfile when the run is profiled and the file was parsed
+        self.profile = profile
+        # project_index.ModuleSymbols when the file was indexed, see project_index.resolve_results
+        self.symbols = symbols
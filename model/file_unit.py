@@ -0,0 +1,11 @@
+import os
+
+
+class FileUnit:
+    def __init__(self, path, tree):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.tree = tree
+        self.is_rl_script = None
+        # project_index.ModuleSymbols, once an indexed detector walked the tree
+        self.symbols = None
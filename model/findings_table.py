@@ -0,0 +1,78 @@
+from array import array
+from typing import Iterable
+
+from model.category import Category
+from model.heuristic import Heuristic
+from model.report import Report
+
+# line_nr of findings that have none (e.g. a missing logging call)
+NO_LINE = -1
+
+# code 0 is "no category", Category members follow in definition order
+CATEGORIES = [None] + list(Category)
+_CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+class _Codes:
+    # distinct values in first-seen order, a column stores their index
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class FindingsTable:
+    # Findings of many reports as parallel columns: file, smell name and details are
+    # codes into shared value lists, category a small int (see CATEGORIES), line numbers
+    # an int array with NO_LINE for None. One row costs a few bytes of array storage
+    # instead of a Heuristic object, and the columns map straight onto a DataFrame.
+    def __init__(self):
+        self.files = _Codes()
+        self.smells = _Codes()
+        self.details = _Codes()
+        self.file_codes = array("I")
+        self.smell_codes = array("I")
+        self.details_codes = array("I")
+        self.category_codes = array("B")
+        self.lines = array("q")
+        self.code_smell_flags = array("B")
+
+    @classmethod
+    def from_reports(cls, reports: Iterable[Report]):
+        table = cls()
+        for report in reports:
+            table.add_report(report)
+        return table
+
+    def add_report(self, report: Report):
+        file_code = self.files.code(report.filename)
+        for heuristic in report.heuristics:
+            self.file_codes.append(file_code)
+            self.smell_codes.append(self.smells.code(heuristic.name))
+            self.details_codes.append(self.details.code(heuristic.details))
+            self.category_codes.append(_CATEGORY_CODES[heuristic.category])
+            self.lines.append(NO_LINE if heuristic.line_nr is None else heuristic.line_nr)
+            self.code_smell_flags.append(bool(heuristic.is_code_smell))
+
+    def __len__(self):
+        return len(self.file_codes)
+
+    def row(self, index):
+        # (filename, Heuristic) of one finding
+        line_nr = self.lines[index]
+        return self.files.values[self.file_codes[index]], Heuristic(
+            self.smells.values[self.smell_codes[index]],
+            self.details.values[self.details_codes[index]],
+            None if line_nr == NO_LINE else line_nr,
+            bool(self.code_smell_flags[index]),
+            CATEGORIES[self.category_codes[index]],
+        )
+
+    def __iter__(self):
+        return (self.row(index) for index in range(len(self)))
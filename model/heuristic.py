@@ -1,7 +1,14 @@
+import sys
+
+
 class Heuristic:
+    # one finding; a fleet scan keeps millions of them, so no per-instance __dict__
+    # and the few distinct smell names are interned and shared
+    __slots__ = ("name", "details", "line_nr", "is_code_smell", "category")
+
     def __init__(self, name, details, line_nr, is_code_smell, category):
-        self.name = name
+        self.name = sys.intern(name)
         self.details = details
         self.line_nr = line_nr
         self.is_code_smell = is_code_smell
-        self.category = category
\ No newline at end of file
+        self.category = category
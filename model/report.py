@@ -3,6 +3,8 @@ from typing import List
 from model.heuristic import Heuristic
 
 class Report:
+    __slots__ = ("filename", "heuristics")
+
     def __init__(self, filename, heuristics: List[Heuristic]):
         self.filename = filename
-        self.heuristics = heuristics
\ No newline at end of file
+        self.heuristics = heuristics
@@ -0,0 +1,136 @@
+import ast
+import os
+import time
+from typing import List, Optional
+
+from analyzer import Analyzer
+from detectors.registry import indexed_detectors
+from model.file_error import PARSE, READ, FileError
+from model.file_result import FileResult
+from model.file_unit import FileUnit
+from model.heuristic import Heuristic
+from model.report import Report
+from profiler import FileProfile
+from pre_processing import RLScriptDetector, may_be_rl_script
+from project_index import ModuleSymbols, may_have_capability
+from project_reader import open_source
+from result_cache import content_hash
+
+# stages that can decide a file is not an RL script, see FileResult.rejected_by
+PREFILTER = "prefilter"
+CLASSIFIER = "classifier"
+
+
+def parse_file_unit(file_path, data: bytes) -> FileUnit:
+    # the only place a file is parsed, every later stage shares the tree; the parser
+    # decodes the bytes itself, by their coding cookie or as UTF-8
+    return FileUnit(file_path, ast.parse(data, filename=file_path))
+
+
+def classify(unit: FileUnit) -> bool:
+    unit.is_rl_script = RLScriptDetector().analyze(unit.tree)
+    return unit.is_rl_script
+
+
+def analyze(unit: FileUnit, handler_stats=None, detectors=None, index=False) -> List[Heuristic]:
+    analyzer = Analyzer(handler_stats, detectors, index)
+    analyzer.visit(unit.tree)
+    heuristics = [item for sublist in analyzer.get_report() for item in sublist]
+    if analyzer.symbols is not None:
+        # after the report, which is when detectors tell what is missing
+        unit.symbols = analyzer.symbols.module_symbols(unit.path)
+    return heuristics
+
+
+def index_unit(unit: FileUnit, data: bytes, detectors=None):
+    # A file that is not analyzed still goes into the project index with its functions
+    # and calls, a helper module may save, evaluate or log for an RL script, itself or
+    # through other helpers. The indexed detectors only walk it when its bytes say they
+    # can find something.
+    indexed = indexed_detectors(detectors)
+    if indexed:
+        analyze(unit, detectors=indexed if may_have_capability(data) else (), index=True)
+        # the file has no report, nothing of it can be missing
+        unit.symbols.missing = {}
+
+
+def index_source(file_path, data: bytes, detectors=None) -> Optional[ModuleSymbols]:
+    # the ModuleSymbols of a file the byte prefilter rejected, for a project index a
+    # call may lead into it (see ProjectIndex.complete); None when it does not parse
+    try:
+        unit = parse_file_unit(file_path, data)
+    except (SyntaxError, ValueError):
+        return None
+    index_unit(unit, data, detectors)
+    return unit.symbols
+
+
+def index_file(file_path, detectors=None) -> Optional[ModuleSymbols]:
+    try:
+        with open_source(file_path) as data:
+            return index_source(file_path, data, detectors)
+    except OSError:
+        return None
+
+
+def process_source(file_path, data: bytes, cache=None, profile=False, key=None, detectors=None) -> FileResult:
+    # key, when given, stands in for content_hash(data) as the cache key (e.g. a git blob SHA);
+    # detectors limits the analysis, see detectors.registry.select_detectors
+    if not may_be_rl_script(data):
+        # not parsed, a project index parses it later if a call may lead into it
+        return FileResult(file_path, None, rejected_by=PREFILTER)
+
+    if cache is not None:
+        key = key or content_hash(data)
+        hit, heuristics, symbols = cache.get(key)
+        if hit:
+            symbols = ModuleSymbols.from_json(file_path, symbols) if symbols is not None else None
+            if heuristics is None:
+                return FileResult(file_path, None, cached=True, rejected_by=CLASSIFIER, symbols=symbols)
+            return FileResult(file_path, Report(os.path.basename(file_path), heuristics), cached=True,
+                              symbols=symbols)
+
+    file_profile = FileProfile(file_path) if profile else None
+    start = time.perf_counter()
+    try:
+        unit = parse_file_unit(file_path, data)
+    except (SyntaxError, ValueError) as e:
+        # ValueError: null bytes before Python 3.12
+        return FileResult(file_path, None, error=FileError.from_exception(PARSE, e))
+
+    if file_profile is not None:
+        file_profile.parse_seconds = time.perf_counter() - start
+        result = _process_profiled(unit, data, file_profile, detectors)
+    elif classify(unit):
+        result = FileResult(file_path, Report(unit.filename, analyze(unit, detectors=detectors)))
+    else:
+        index_unit(unit, data, detectors)
+        result = FileResult(file_path, None, rejected_by=CLASSIFIER)
+    result.symbols = unit.symbols
+
+    if cache is not None:
+        cache.put(key, result.report.heuristics if result.report is not None else None, result.symbols)
+        result.cached = False
+    return result
+
+
+def _process_profiled(unit: FileUnit, data: bytes, profile: FileProfile, detectors=None) -> FileResult:
+    # the stages after parsing, timed into profile
+    start = time.perf_counter()
+    is_rl_script = classify(unit)
+    classified = time.perf_counter()
+    profile.classify_seconds = classified - start
+    if not is_rl_script:
+        index_unit(unit, data, detectors)
+        return FileResult(unit.path, None, rejected_by=CLASSIFIER, profile=profile)
+    heuristics = analyze(unit, profile.handlers, detectors)
+    profile.analysis_seconds = time.perf_counter() - classified
+    return FileResult(unit.path, Report(unit.filename, heuristics), profile=profile)
+
+
+def process_file(file_path, cache=None, profile=False, detectors=None) -> FileResult:
+    try:
+        with open_source(file_path) as data:
+            return process_source(file_path, data, cache, profile, detectors=detectors)
+    except OSError as e:
+        return FileResult(file_path, None, error=FileError.from_exception(READ, e))
@@ -1,6 +1,57 @@
 import ast
 import re
 
+from detectors.name_resolver import NameResolver
+
+rl_libraries = {
+    "gym", "stable_baselines3", "sb3_contrib", "ray.rllib", "rlberry", "torchrl"
+}
+
+rl_algorithms = {
+    "PPO", "DQN", "A2C", "SAC", "TD3", "DDPG", "TRPO"
+}
+
+agent_interaction_methods = ("step", "predict", "learn", "train")
+
+custom_env_pattern = re.compile(r"^(create_env|make_env)$")
+agent_interaction_pattern = re.compile(r".*\.(step|predict|learn|train)$")
+environment_creation_pattern = re.compile(r"^(gym|sumo_rl|custom_envs)\..*(make|create|Env)$")
+
+# Byte-level necessary conditions for RLScriptDetector.analyze, one alternation scanned once.
+# "rl" tokens can produce rl_imports/models/agent_interactions ("rllib" because
+# "ray . rllib" is a valid dotted name), "env" tokens environments/custom_envs/class_definitions.
+# "gym" satisfies both (import gym / gym.make).
+rl_prefilter_pattern = re.compile(
+    rb"(?P<both>gym)"
+    rb"|(?P<env>(?i:env)|sumo_rl)"
+    rb"|(?P<rl>" + rb"|".join(
+        re.escape(token.encode())
+        for token in sorted({"stable_baselines3", "sb3_contrib", "rllib", "rlberry", "torchrl"}
+                            | rl_algorithms | set(agent_interaction_methods))
+    ) + rb")"
+)
+
+
+def may_be_rl_script(data: bytes) -> bool:
+    # False means the file cannot be classified as an RL script, so it need not be parsed
+    found_rl = found_env = False
+    for match in rl_prefilter_pattern.finditer(data):
+        group = match.lastgroup
+        if group == "both":
+            return True
+        if group == "rl":
+            found_rl = True
+        else:
+            found_env = True
+        if found_rl and found_env:
+            return True
+    return False
+
+
+class _ClassificationDone(Exception):
+    pass
+
+
 class RLScriptDetector(ast.NodeVisitor):
     def __init__(self):
         self.rl_imports = set()
@@ -11,21 +62,25 @@ class RLScriptDetector(ast.NodeVisitor):
         self.class_definitions = set()
         self.assignments = {}
 
-        self.rl_libraries = {
-            "gym", "stable_baselines3", "sb3_contrib", "ray.rllib", "rlberry", "torchrl"
-        }
+        self.rl_libraries = rl_libraries
+        self.rl_algorithms = rl_algorithms
+        self.names = NameResolver()
 
-        self.rl_algorithms = {
-            "PPO", "DQN", "A2C", "SAC", "TD3", "DDPG", "TRPO"
-        }
+    def visit(self, node):
+        super().visit(node)
+        # the answer cannot change any more, skip the rest of the tree
+        if self.is_rl_script():
+            raise _ClassificationDone
 
     def visit_Import(self, node):
+        self.names.visit_Import(node)
         for alias in node.names:
             if alias.name in self.rl_libraries:
                 self.rl_imports.add(alias.name)
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
+        self.names.visit_ImportFrom(node)
         if node.module and any(lib in node.module for lib in self.rl_libraries):
             self.rl_imports.add(node.module)
         self.generic_visit(node)
@@ -51,7 +106,11 @@ class RLScriptDetector(ast.NodeVisitor):
 
     def visit_Call(self, node):
         if isinstance(node.func, ast.Attribute):
-            func_name = f"{ast.unparse(node.func.value)}.{node.func.attr}"
+            # import aliases resolved (sb3.PPO -> stable_baselines3.PPO); only chains
+            # with calls or subscripts in them still need their source text
+            func_name = self.names.qualified_name(node.func)
+            if func_name is None:
+                func_name = f"{ast.unparse(node.func.value)}.{node.func.attr}"
 
             self.detect_environment_creation(func_name)
             self.detect_model(func_name)
@@ -63,11 +122,11 @@ class RLScriptDetector(ast.NodeVisitor):
         self.generic_visit(node)
 
     def detect_custom_environment_creation(self, node):
-        if re.match(r"^(create_env|make_env)$", node.func.id):
+        if custom_env_pattern.match(node.func.id):
             self.custom_envs.add(node.func.id)
 
     def detect_agent_interactions(self, func_name):
-        if re.match(r".*\.(step|predict|learn|train)$", func_name):
+        if agent_interaction_pattern.match(func_name):
             self.agent_interactions.add(func_name)
 
     def detect_model(self, func_name):
@@ -75,19 +134,19 @@ class RLScriptDetector(ast.NodeVisitor):
             self.models.add(func_name)
 
     def detect_environment_creation(self, func_name):
-        if re.match(r"^(gym|sumo_rl|custom_envs)\..*(make|create|Env)$", func_name):
+        if environment_creation_pattern.match(func_name):
             self.environments.add(func_name)
 
-    # todo maybe refactor this and don't read the file twice
-    def analyze(self, filename):
-        with open(filename, "r", encoding="utf-8") as f:
-            tree = ast.parse(f.read(), filename=filename)
-
-        self.visit(tree)
-
-        is_rl_script = bool(
+    def is_rl_script(self):
+        return bool(
             (self.rl_imports or self.models or self.agent_interactions)
             and (self.environments or self.custom_envs or self.class_definitions)
         )
 
-        return is_rl_script
+    def analyze(self, tree):
+        try:
+            self.visit(tree)
+        except _ClassificationDone:
+            pass
+
+        return self.is_rl_script()
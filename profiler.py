@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from collections import defaultdict
+
+PROFILE_FILENAME = "profile.json"
+TOP_N = 20
+
+
+def profile_dispatch(dispatch, handler_stats):
+    # same table with every handler wrapped to add its time and one call to
+    # handler_stats[(detector, method)]; only built when profiling, so a normal
+    # run keeps calling the bound methods directly
+    clock = time.perf_counter
+
+    def timed(handler):
+        stats = handler_stats.setdefault((type(handler.__self__).__name__, handler.__name__), [0.0, 0])
+
+        def wrapper(node):
+            start = clock()
+            handler(node)
+            stats[0] += clock() - start
+            stats[1] += 1
+        return wrapper
+
+    return {node_type: [timed(handler) for handler in handlers] for node_type, handlers in dispatch.items()}
+
+
+class FileProfile:
+    # timings of one file, travels back from the worker on FileResult.profile
+    def __init__(self, path):
+        self.path = path
+        self.parse_seconds = 0.0
+        self.classify_seconds = 0.0
+        self.analysis_seconds = 0.0
+        self.handlers = {}
+
+    @property
+    def total_seconds(self):
+        return self.parse_seconds + self.classify_seconds + self.analysis_seconds
+
+
+class ProfileSummary:
+    def __init__(self):
+        self.files = []
+        self.handlers = defaultdict(lambda: [0.0, 0])
+
+    def add(self, profile: FileProfile):
+        self.files.append((profile.path, profile.parse_seconds, profile.classify_seconds, profile.analysis_seconds))
+        for key, (seconds, calls) in profile.handlers.items():
+            stats = self.handlers[key]
+            stats[0] += seconds
+            stats[1] += calls
+
+    def slowest_files(self, n=TOP_N):
+        rows = sorted(self.files, key=lambda row: row[1] + row[2] + row[3], reverse=True)[:n]
+        return [
+            {"File": path, "Parse (s)": round(parse, 6), "Classify (s)": round(classify, 6),
+             "Analysis (s)": round(analysis, 6), "Total (s)": round(parse + classify + analysis, 6)}
+            for path, parse, classify, analysis in rows
+        ]
+
+    def hottest_detectors(self, n=TOP_N):
+        rows = sorted(self.handlers.items(), key=lambda item: item[1][0], reverse=True)[:n]
+        return [
+            {"Detector": detector, "Method": method, "Calls": calls, "Total (s)": round(seconds, 6),
+             "Per call (us)": round(seconds / calls * 1e6, 3) if calls else 0.0}
+            for (detector, method), (seconds, calls) in rows
+        ]
+
+    def to_json(self):
+        return {
+            "files_profiled": len(self.files),
+            "parse_seconds": round(sum(row[1] for row in self.files), 6),
+            "classify_seconds": round(sum(row[2] for row in self.files), 6),
+            "analysis_seconds": round(sum(row[3] for row in self.files), 6),
+            "slowest_files": self.slowest_files(),
+            "hottest_detectors": self.hottest_detectors(),
+        }
+
+    def write(self, folder):
+        path = os.path.join(folder, PROFILE_FILENAME)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_json(), file, indent=1)
+        return path
+
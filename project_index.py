@@ -0,0 +1,381 @@
+import ast
+import builtins
+import json
+import os
+import re
+from collections import defaultdict
+
+from model.category import Category
+from model.heuristic import Heuristic
+
+# what a function does itself or through the functions it calls
+CHECKPOINT = "checkpoint"
+EVALUATION = "evaluation"
+LOGGING = "logging"
+
+# calls made outside any function
+MODULE_SCOPE = "<module>"
+INDEX_FILENAME = "index.json"
+
+_BUILTINS = frozenset(dir(builtins))
+
+# Byte-level necessary condition for a file that is not an RL script to have a
+# capability of its own, mirroring what the checkpoint (save...), evaluation
+# (model.eval, EvalCallback, test_env.) and logging (.info...) detectors match; the
+# other helper modules are only walked for their functions and calls.
+capability_prefilter_pattern = re.compile(
+    rb"save|eval|EvalCallback|test_env\.|validation_env\.|\.(?:info|debug|error|warning|critical|log)\b"
+)
+
+
+def may_have_capability(data: bytes) -> bool:
+    return capability_prefilter_pattern.search(data) is not None
+
+
+class ModuleSymbols:
+    # What one file adds to the ProjectIndex: its functions ("Class.method" for
+    # methods), the calls each makes to them or through a name an import bound
+    # (imports expanded, relative imports kept with their leading dots), the
+    # capabilities the detectors saw in each, and the "missing" findings the file was
+    # given, by capability, as (name, details, is_code_smell, category name). Plain
+    # data, so it travels back from workers, goes into the result cache and saves as
+    # JSON.
+    def __init__(self, path, functions=(), calls=None, capabilities=None, missing=None):
+        self.path = path
+        self.functions = frozenset(functions)
+        self.calls = calls or {}
+        self.capabilities = capabilities or {}
+        self.missing = missing or {}
+
+    def to_json(self):
+        # the path is left out, cache entries are shared by files with the same contents
+        return {
+            "functions": sorted(self.functions),
+            "calls": {function: sorted(callees) for function, callees in self.calls.items()},
+            "capabilities": {function: sorted(found) for function, found in self.capabilities.items()},
+            "missing": self.missing,
+        }
+
+    @classmethod
+    def from_json(cls, path, data):
+        return cls(path, data["functions"], data["calls"], data["capabilities"],
+                   {capability: tuple(finding) for capability, finding in data["missing"].items()})
+
+
+class SymbolCollector(ast.NodeVisitor):
+    # Fills a ModuleSymbols during the shared traversal, after the NameResolver and
+    # before the detectors. Detectors report capabilities through add_capability,
+    # which files them under the function being visited. Only a call whose head an
+    # import bound can lead into another module; agent.learn() on a local variable
+    # is kept only if the file defines agent.learn itself.
+    def __init__(self, names, scope):
+        self.names = names
+        self.scope = scope
+        self.relative_aliases = {}
+        # names bound by `import a.b` (a), `import a as b` and absolute `from a import b`
+        self.imported = set()
+        self._qualnames = {}
+        self.calls = defaultdict(set)
+        # calls that can only land in the file's own functions, known once it is walked
+        self._local_calls = defaultdict(set)
+        self.capabilities = defaultdict(set)
+        self.missing = {}
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imported.add(alias.asname or alias.name.partition(".")[0])
+
+    def visit_ImportFrom(self, node):
+        prefix = "." * node.level + (f"{node.module}." if node.module else "")
+        for alias in node.names:
+            if alias.name == "*":
+                continue
+            if node.level:
+                self.relative_aliases[alias.asname or alias.name] = prefix + alias.name
+            else:
+                self.imported.add(alias.asname or alias.name)
+
+    def visit_FunctionDef(self, node):
+        # handlers run before the function is entered, so the scope is still its parent
+        parent = self.scope.scopes[-1] if self.scope.scopes else None
+        self._qualnames[node] = f"{parent.name}.{node.name}" if isinstance(parent, ast.ClassDef) else node.name
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def current_function(self):
+        function = self.scope.current_function
+        return MODULE_SCOPE if function is None else self._qualnames[function]
+
+    def visit_Call(self, node):
+        name = self.names.dotted_name(node.func)
+        if name is None or name in _BUILTINS:
+            return
+        head, separator, rest = name.partition(".")
+        if head in self.relative_aliases:
+            self.calls[self.current_function()].add(self.relative_aliases[head] + separator + rest)
+        elif head in self.imported:
+            self.calls[self.current_function()].add(self.names.qualified_name(node.func))
+        elif head in ("self", "cls") and separator and self.scope.current_class is not None:
+            self._local_calls[self.current_function()].add(f"{self.scope.current_class.name}.{rest}")
+        else:
+            self._local_calls[self.current_function()].add(name)
+
+    def add_capability(self, capability):
+        self.capabilities[self.current_function()].add(capability)
+
+    def add_missing(self, capability, heuristic):
+        category = heuristic.category.name if heuristic.category is not None else None
+        self.missing[capability] = (heuristic.name, heuristic.details, heuristic.is_code_smell, category)
+
+    def module_symbols(self, path):
+        functions = frozenset(self._qualnames.values())
+        calls = {function: set(callees) for function, callees in self.calls.items()}
+        for function, callees in self._local_calls.items():
+            if callees & functions:
+                calls.setdefault(function, set()).update(callees & functions)
+        return ModuleSymbols(path, functions, calls, dict(self.capabilities), dict(self.missing))
+
+
+def _add_suffixes(table, name):
+    parts = name.split(".")
+    for i in range(len(parts)):
+        table[".".join(parts[i:])].add(name)
+
+
+def _discard_suffixes(table, name):
+    parts = name.split(".")
+    for i in range(len(parts)):
+        suffix = ".".join(parts[i:])
+        table[suffix].discard(name)
+        if not table[suffix]:
+            del table[suffix]
+
+
+class ProjectIndex:
+    # Every file's ModuleSymbols by module name (utils/ckpt.py is utils.ckpt), so a
+    # call to utils.ckpt.save_checkpoint, ckpt.save_checkpoint (src layouts) or
+    # .ckpt.save_checkpoint resolves with dictionary lookups. update() replaces a
+    # single file, which is all a changed file costs. Files the byte prefilter rejected
+    # are only known by path (skip()) until a call may lead into them; complete() then
+    # parses them with index_module(path) -> ModuleSymbols or None.
+    def __init__(self, root, index_module=None):
+        self.root = root
+        self.index_module = index_module
+        self.modules = {}
+        self._packages = {}
+        # every dotted suffix of a module name -> the modules ending with it
+        self._by_suffix = defaultdict(set)
+        # module name -> path of the skipped files, and their suffixes like _by_suffix
+        self.skipped = {}
+        self._skipped_by_suffix = defaultdict(set)
+        # (module, function) -> capabilities it reaches, dropped on every update
+        self._reaches = {}
+
+    def module_name(self, path):
+        parts = os.path.relpath(path, self.root)[:-len(".py")].replace(os.sep, "/").split("/")
+        is_package = parts[-1] == "__init__"
+        if is_package:
+            parts.pop()
+        return ".".join(parts), ".".join(parts if is_package else parts[:-1])
+
+    def update(self, symbols: ModuleSymbols):
+        self.remove(symbols.path)
+        name, package = self.module_name(symbols.path)
+        self.modules[name] = symbols
+        self._packages[name] = package
+        _add_suffixes(self._by_suffix, name)
+        self._reaches.clear()
+
+    def skip(self, path):
+        self.remove(path)
+        name, _ = self.module_name(path)
+        self.skipped[name] = path
+        _add_suffixes(self._skipped_by_suffix, name)
+
+    def remove(self, path):
+        name, _ = self.module_name(path)
+        if self.skipped.pop(name, None) is not None:
+            _discard_suffixes(self._skipped_by_suffix, name)
+        if self.modules.pop(name, None) is None:
+            return
+        del self._packages[name]
+        _discard_suffixes(self._by_suffix, name)
+        self._reaches.clear()
+
+    def _absolute(self, module, target):
+        # .ckpt.save from package a.b is a.b.ckpt.save, ..ckpt.save is a.ckpt.save
+        level = len(target) - len(target.lstrip("."))
+        if not level:
+            return target
+        package = self._packages[module].split(".") if self._packages[module] else []
+        if level - 1 > len(package):
+            return None
+        return ".".join(package[:len(package) - (level - 1)] + [target[level:]])
+
+    def _targets(self, module, callee):
+        # (module, function) pairs a call made in module can land in; a call that is not
+        # to the module's own functions went through an import, its head is a module
+        callee = self._absolute(module, callee)
+        if callee is None:
+            return []
+        if callee in self.modules[module].functions:
+            return [(module, callee)]
+        parts = callee.split(".")
+        for i in range(len(parts) - 1, 0, -1):
+            candidates = self._by_suffix.get(".".join(parts[:i]))
+            if candidates:
+                function = ".".join(parts[i:])
+                return [(candidate, function) for candidate in candidates
+                        if function in self.modules[candidate].functions]
+        return []
+
+    def _skipped_targets(self, module, callee):
+        # paths of the skipped files a call made in module can land in, looked up like
+        # _targets, which stops at the longest module name with indexed candidates
+        callee = self._absolute(module, callee)
+        if callee is None or callee in self.modules[module].functions:
+            return []
+        parts = callee.split(".")
+        for i in range(len(parts) - 1, 0, -1):
+            prefix = ".".join(parts[:i])
+            names = self._skipped_by_suffix.get(prefix)
+            if names or prefix in self._by_suffix:
+                return [self.skipped[name] for name in names or ()]
+        return []
+
+    def _reach(self, module, function):
+        key = (module, function)
+        if key not in self._reaches:
+            self._connect(key, {}, {}, [], {})
+        return self._reaches[key]
+
+    def _connect(self, key, order, lowlink, stack, reached):
+        # Tarjan's strongly connected components: functions that call each other reach
+        # the same capabilities, so a cycle is only stored once it is complete, as the
+        # union of its members, whichever of them was asked for first
+        order[key] = lowlink[key] = len(order)
+        stack.append(key)
+        module, function = key
+        symbols = self.modules[module]
+        reached[key] = set(symbols.capabilities.get(function, ()))
+        for callee in symbols.calls.get(function, ()):
+            for target in self._targets(module, callee):
+                if target not in self._reaches and target not in order:
+                    self._connect(target, order, lowlink, stack, reached)
+                if target in self._reaches:
+                    reached[key] |= self._reaches[target]
+                else:
+                    # still on the stack, part of the same component
+                    lowlink[key] = min(lowlink[key], lowlink[target])
+        if lowlink[key] == order[key]:
+            component = []
+            while not component or component[-1] != key:
+                component.append(stack.pop())
+            found = frozenset().union(*(reached[member] for member in component))
+            for member in component:
+                self._reaches[member] = found
+
+    def reached_through(self, symbols: ModuleSymbols, capability):
+        # a call in the file that leads to capability in another module, None if there is none
+        module, _ = self.module_name(symbols.path)
+        if self.modules.get(module) is not symbols:
+            self.update(symbols)
+        for function, callees in symbols.calls.items():
+            for callee in callees:
+                for target in self._targets(module, callee):
+                    if target[0] != module and capability in self._reach(*target):
+                        return callee
+        return None
+
+    def unresolved(self, symbols: ModuleSymbols):
+        # the file's "missing" findings that no call into another module resolves
+        return [
+            Heuristic(name, details, None, is_code_smell, Category[category] if category is not None else None)
+            for capability, (name, details, is_code_smell, category) in symbols.missing.items()
+            if self.reached_through(symbols, capability) is None
+        ]
+
+    def complete(self):
+        # Parses the skipped files a call may lead into from a file with unresolved
+        # "missing" findings, directly or through other modules, until there are none.
+        while self.skipped and self.index_module is not None:
+            wanted = set()
+            seen = set()
+            stack = [(name, function) for name, symbols in self.modules.items()
+                     if symbols.missing and self.unresolved(symbols) for function in symbols.calls]
+            while stack:
+                key = stack.pop()
+                if key in seen:
+                    continue
+                seen.add(key)
+                module, function = key
+                for callee in self.modules[module].calls.get(function, ()):
+                    stack.extend(self._targets(module, callee))
+                    wanted.update(self._skipped_targets(module, callee))
+            if not wanted:
+                return
+            for path in wanted:
+                symbols = self.index_module(path)
+                if symbols is None:
+                    # does not parse, nothing can land in it
+                    self.remove(path)
+                else:
+                    self.update(symbols)
+
+    def corrections(self):
+        # path -> (findings, heuristics) of every indexed file with "missing" findings,
+        # see ReportWriter.correct: whatever the report holds of those findings, by
+        # (name, details), is replaced by the ones the whole project leaves unresolved
+        self.complete()
+        return {
+            symbols.path: ({(finding[0], finding[1]) for finding in symbols.missing.values()},
+                           self.unresolved(symbols))
+            for symbols in list(self.modules.values()) if symbols.missing
+        }
+
+    def save(self, folder):
+        path = os.path.join(folder, INDEX_FILENAME)
+        with open(path, "w", encoding="utf-8") as file:
+            # skipped files as null
+            modules = {os.path.relpath(path, self.root): None for path in self.skipped.values()}
+            modules.update((os.path.relpath(symbols.path, self.root), symbols.to_json())
+                           for symbols in self.modules.values())
+            json.dump(modules, file)
+        return path
+
+    @classmethod
+    def load(cls, folder, root, index_module=None):
+        # the index a previous run saved into folder, an empty one if there is none
+        index = cls(root, index_module)
+        try:
+            with open(os.path.join(folder, INDEX_FILENAME), encoding="utf-8") as file:
+                modules = json.load(file)
+        except (OSError, ValueError):
+            return index
+        for relative_path, data in modules.items():
+            path = os.path.join(root, relative_path)
+            if data is None:
+                index.skip(path)
+            else:
+                index.update(ModuleSymbols.from_json(path, data))
+        return index
+
+
+def resolve_results(results, index: ProjectIndex):
+    # Passes FileResults straight through, feeding their symbols into index (files the
+    # byte prefilter rejected by path only). Their "missing" findings are taken out of
+    # the reports: whether another module resolves them is only known once every file
+    # is indexed, index.corrections() then has the ones that remain.
+    for result in results:
+        symbols = result.symbols
+        if result.rejected_by == "prefilter":
+            index.skip(result.path)
+        elif symbols is not None:
+            index.update(symbols)
+            if result.report is not None and symbols.missing:
+                decided = {(finding[0], finding[1]) for finding in symbols.missing.values()}
+                result.report.heuristics = [
+                    heuristic for heuristic in result.report.heuristics
+                    if heuristic.line_nr is not None or (heuristic.name, heuristic.details) not in decided
+                ]
+        yield result
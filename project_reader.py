@@ -1,31 +1,292 @@
+import mmap
 import os
+import subprocess
+from contextlib import contextmanager
 
-def read_file(file_path):
+from gitignore import GITIGNORE_FILENAME, IgnoreRules, load_rules
+from model.file_error import READ, FileError
+
+
+# from this size on a file is mapped instead of copied into memory
+MMAP_THRESHOLD = 256 * 1024
+
+
+@contextmanager
+def open_source(file_path):
+    # The raw bytes of a file, valid inside the with block: a bytes object, or a
+    # read-only mmap from MMAP_THRESHOLD on, so the prefilter, the content hash and
+    # ast.parse all read the page cache directly. Bytes, not text, go to the parser,
+    # which then honors PEP 263 coding cookies. OSError when it cannot be read.
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < MMAP_THRESHOLD:
+            yield file.read()
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def read_source(file_path) -> bytes:
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+# folders never worth descending into: VCS data, virtualenvs, dependencies, build output, caches
+PRUNED_DIRS = frozenset({
+    ".git", ".hg", ".svn", ".venv", "venv", "site-packages", "node_modules", "build", "__pycache__",
+    ".ipynb_checkpoints", ".tox",
+})
+# larger files are generated or data, not scripts someone wrote
+MAX_SOURCE_BYTES = 2 * 1024 * 1024
+# protobuf/gRPC stubs
+GENERATED_SUFFIXES = ("_pb2.py", "_pb2_grpc.py")
+
+
+def _is_source_name(filename):
+    return filename.endswith('.py') and not filename.startswith('._') and not filename.endswith(GENERATED_SUFFIXES)
+
+
+def is_source_file(path):
+    parts = path.replace('\\', '/').split('/')
+    return _is_source_name(parts[-1]) and PRUNED_DIRS.isdisjoint(parts[:-1])
+
+
+def _ignored(relative_path, is_dir, excludes, rules):
+    # excludes always win, then the deepest .gitignore with a matching pattern decides
+    if excludes.match(relative_path, is_dir):
+        return True
+    for base, folder_rules in reversed(rules):
+        result = folder_rules.match(relative_path[len(base) + 1:] if base else relative_path, is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def _excluded(relative_path, excludes):
+    # a git path is excluded when it or one of its folders matches
+    if excludes.match(relative_path, False):
+        return True
+    parts = relative_path.split("/")
+    return any(excludes.match("/".join(parts[:i]), True) for i in range(1, len(parts)))
+
+
+def _with_own_rules(directory, relative, rules):
+    # rules plus the .gitignore of directory, if it has one
+    own_rules = load_rules(directory)
+    return rules + ((relative, own_rules),) if own_rules is not None else rules
+
+
+def _enters(name, relative_path, excludes, rules):
+    # whether walk_source_files descends into a folder it found
+    return name not in PRUNED_DIRS and not _ignored(relative_path, True, excludes, rules)
+
+
+def walk_source_files(folder, exclude=(), gitignore=True, max_bytes=MAX_SOURCE_BYTES):
+    # Yields source files under folder as it finds them, files of a folder before its
+    # subfolders. PRUNED_DIRS, folders ignored by a .gitignore (when gitignore is set)
+    # and folders matching an exclude pattern (gitignore syntax, relative to folder)
+    # are never entered. Folder symlinks are followed once per real folder, so loops
+    # end; files above max_bytes and generated stubs are skipped.
+    excludes = IgnoreRules(exclude)
+    visited = set()
+    # (folder, its path relative to folder, (base, IgnoreRules) of the .gitignores above it)
+    stack = [(folder, "", ())]
+    while stack:
+        directory, relative, rules = stack.pop()
+        try:
+            info = os.stat(directory)
+            if (info.st_dev, info.st_ino) in visited:
+                continue
+            visited.add((info.st_dev, info.st_ino))
+            with os.scandir(directory) as scanned:
+                entries = list(scanned)
+        except OSError:
+            continue
+        if gitignore and any(entry.name == GITIGNORE_FILENAME for entry in entries):
+            rules = _with_own_rules(directory, relative, rules)
+
+        subfolders = []
+        for entry in entries:
+            name = entry.name
+            entry_relative = f"{relative}/{name}" if relative else name
+            try:
+                is_dir = entry.is_dir()
+                if is_dir:
+                    if _enters(name, entry_relative, excludes, rules):
+                        subfolders.append((entry.path, entry_relative, rules))
+                elif (_is_source_name(name) and entry.is_file()
+                      and not _ignored(entry_relative, False, excludes, rules)
+                      and entry.stat().st_size <= max_bytes):
+                    yield entry.path
+            except OSError:
+                # e.g. a broken symlink
+                continue
+        stack.extend(reversed(subfolders))
+
+
+def is_walked_source(folder, relative_path, exclude=(), gitignore=True, max_bytes=MAX_SOURCE_BYTES):
+    # Whether walk_source_files(folder, ...) yields folder/relative_path (a "/"
+    # separated path, e.g. one git reported), by the same checks on the folders above
+    # it and the file itself, without walking the rest of the tree.
+    excludes = exclude if isinstance(exclude, IgnoreRules) else IgnoreRules(exclude)
+    *folders, name = relative_path.split("/")
+    directory, relative, rules = folder, "", ()
+    for folder_name in folders:
+        if gitignore:
+            rules = _with_own_rules(directory, relative, rules)
+        relative = f"{relative}/{folder_name}" if relative else folder_name
+        if not _enters(folder_name, relative, excludes, rules):
+            return False
+        directory = os.path.join(directory, folder_name)
+    if gitignore:
+        rules = _with_own_rules(directory, relative, rules)
+    path = os.path.join(folder, relative_path)
     try:
-        with open(file_path, 'r', encoding="utf-8", errors="ignore") as file:
-            return file.read()
-    except Exception as e:
-        return f"Error reading {file_path}: {e}"
+        return (_is_source_name(name) and os.path.isfile(path)
+                and not _ignored(relative_path, False, excludes, rules)
+                and os.path.getsize(path) <= max_bytes)
+    except OSError:
+        return False
 
 
-class ProjectReader:
+class GitBlobReader:
+    # One long-lived `git cat-file --batch` for a repository: each read writes a blob
+    # SHA to its stdin and takes "<sha> <type> <size>\n<contents>\n" off its stdout,
+    # so reading thousands of files costs one process instead of one per file.
     def __init__(self, folder_path):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=folder_path, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+
+    def read(self, sha) -> bytes:
+        self.process.stdin.write(sha.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            raise ValueError(f"git cat-file could not read {sha}: {b' '.join(header).decode(errors='replace')}")
+        size = int(header[2])
+        data = self.process.stdout.read(size)
+        self.process.stdout.read(1)
+        return data
+
+    def close(self):
+        # Closing stdin is not enough for git to see EOF when processes forked since
+        # (e.g. an executor's workers) hold a copy of the pipe, and nothing is left to
+        # read, so the process is stopped outright.
+        self.process.stdin.close()
+        if self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ProjectReader:
+    def __init__(self, folder_path, exclude=()):
+        # exclude: gitignore-style patterns relative to folder_path, on top of .gitignore
         self.folder_path = folder_path
+        self.exclude = list(exclude)
         if not os.path.isdir(self.folder_path):
             raise ValueError(f"The path {self.folder_path} is not a valid directory.")
 
+    def list_changed_files(self, base, head):
+        # (added or modified paths, deleted or renamed-away paths) between two revisions,
+        # relative paths are joined to folder_path like list_files does
+        try:
+            output = subprocess.run(
+                ["git", "diff", "--name-status", "-z", "--no-color", "--relative", base, head],
+                cwd=self.folder_path, capture_output=True, text=True, errors="surrogateescape", check=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr = getattr(e, "stderr", "") or ""
+            raise ValueError(f"Could not diff {base}..{head} in {self.folder_path}: {stderr.strip() or e}")
+
+        # -z output: status NUL path NUL, renames and copies carry two paths
+        changed, removed = [], []
+        fields = iter(output.split("\0"))
+        for status in fields:
+            if not status:
+                continue
+            status = status[0]
+            if status in ("R", "C"):
+                old_path, new_path = next(fields), next(fields)
+                if status == "R":
+                    removed.append(old_path)
+                changed.append(new_path)
+            elif status == "D":
+                removed.append(next(fields))
+            else:
+                path = next(fields)
+                if status in ("A", "M", "T"):
+                    changed.append(path)
+
+        # a changed file goes through the same checks as in walk_source_files, so the merged
+        # report matches a full scan; one it skips now (e.g. grown past MAX_SOURCE_BYTES or
+        # newly ignored) counts as removed, a full scan would not report it either
+        excludes = IgnoreRules(self.exclude)
+        walked = [path for path in changed if is_walked_source(self.folder_path, path, excludes)]
+        removed += sorted(set(changed).difference(walked))
+        return ([os.path.join(self.folder_path, path) for path in walked],
+                [os.path.join(self.folder_path, path) for path in removed if is_source_file(path)])
+
+    def list_blobs(self, revision="HEAD"):
+        # (path, blob SHA, size) of every source file in a commit, read from the object
+        # store, so bare clones and clones without a checkout work too; like
+        # list_changed_files, only the part of the tree under folder_path is listed and
+        # paths are joined to it. Path names are not necessarily UTF-8, undecodable
+        # bytes are kept as surrogates, which open() turns back into the same bytes.
+        try:
+            output = subprocess.run(
+                ["git", "ls-tree", "-r", "-z", "--long", revision],
+                cwd=self.folder_path, capture_output=True, text=True, errors="surrogateescape", check=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr = getattr(e, "stderr", "") or ""
+            raise ValueError(f"Could not list {revision} in {self.folder_path}: {stderr.strip() or e}")
+
+        # -z --long output: mode SP type SP sha SP* size TAB path NUL
+        excludes = IgnoreRules(self.exclude)
+        blobs = []
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1)
+            mode, kind, sha, size = info.split()
+            # symlinks are blobs too (mode 120000), their contents are a path
+            if kind != "blob" or mode == "120000" or not is_source_file(path) or _excluded(path, excludes):
+                continue
+            # "BAD" instead of a size when the object is missing, read_blobs reports it
+            blobs.append((os.path.join(self.folder_path, path), sha, int(size) if size.isdigit() else 0))
+        return blobs
+
+    def read_blobs(self, blobs):
+        # (path, contents, cache key) for each entry of list_blobs, all read through one
+        # GitBlobReader; the blob SHA already names the contents, so it is the cache key.
+        # A blob git cannot hand out comes with a FileError instead of its contents, the
+        # other files are still read.
+        with GitBlobReader(self.folder_path) as reader:
+            for path, sha, _ in blobs:
+                try:
+                    data = reader.read(sha)
+                except (OSError, ValueError) as e:
+                    data = FileError.from_exception(READ, e)
+                yield path, data, "git:" + sha
+
+    def walk_files(self):
+        # lazy list_files, analysis can start on the first file found
+        return walk_source_files(self.folder_path, self.exclude)
+
     def list_files(self, recursive=True):
         if recursive:
-            return [
-                os.path.join(root, file)
-                for root, _, files in os.walk(self.folder_path)
-                if '/venv/' not in root.replace('\\', '/')
-                for file in files
-                if file.endswith('.py') and not file.startswith('._')
-            ]
+            return list(self.walk_files())
         else:
             return [
                 os.path.join(self.folder_path, file)
                 for file in os.listdir(self.folder_path)
-                if file.endswith('.py') and os.path.isfile(os.path.join(self.folder_path, file))
+                if _is_source_name(file) and os.path.isfile(os.path.join(self.folder_path, file))
             ]
@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import subprocess
+import time
+from array import array
+from typing import Optional
+
+from model.findings_table import FindingsTable
+from result_cache import detector_fingerprint
+
+DEFAULT_REPORT_CACHE_PATH = os.path.join("./results", ".cache", "reports.sqlite3")
+DEFAULT_REPORT_CACHE_MAX_BYTES = 128 * 1024 * 1024
+LS_REMOTE_TIMEOUT = 30
+
+_COLUMNS = ["file_codes", "smell_codes", "details_codes", "category_codes", "lines", "code_smell_flags"]
+
+
+def normalize_repo_url(repo_url):
+    # https://github.com/a/b, https://github.com/a/b/ and https://github.com/a/b.git are one repository
+    url = repo_url.strip().rstrip("/")
+    return url[:-len(".git")] if url.endswith(".git") else url
+
+
+def resolve_head(repo_url):
+    # SHA the remote HEAD points at, without cloning; raises ValueError when the
+    # remote cannot be read or has no commits
+    try:
+        output = subprocess.run(
+            ["git", "ls-remote", "--", repo_url, "HEAD"],
+            capture_output=True, text=True, check=True, timeout=LS_REMOTE_TIMEOUT,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        ).stdout
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        stderr = getattr(e, "stderr", "") or ""
+        raise ValueError(f"Could not read {repo_url}: {stderr.strip() or e}")
+    for line in output.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref == "HEAD":
+            return sha
+    raise ValueError(f"{repo_url} has no HEAD commit")
+
+
+def serialize_findings(table: FindingsTable):
+    return json.dumps({
+        "files": table.files.values,
+        "smells": table.smells.values,
+        "details": table.details.values,
+        "columns": {name: getattr(table, name).tolist() for name in _COLUMNS},
+    })
+
+
+def deserialize_findings(payload) -> FindingsTable:
+    data = json.loads(payload)
+    table = FindingsTable()
+    for codes, values in ((table.files, data["files"]), (table.smells, data["smells"]),
+                          (table.details, data["details"])):
+        for value in values:
+            codes.code(value)
+    for name in _COLUMNS:
+        column = getattr(table, name)
+        setattr(table, name, array(column.typecode, data["columns"][name]))
+    return table
+
+
+class ReportCache:
+    # Finished findings per (repository, commit), shared by every app session through
+    # one SQLite file. Entries made with other detector code are never returned.
+    def __init__(self, path=DEFAULT_REPORT_CACHE_PATH, max_bytes=DEFAULT_REPORT_CACHE_MAX_BYTES, detectors=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fingerprint = detector_fingerprint(detectors)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " repo_url TEXT NOT NULL,"
+            " sha TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (repo_url, sha, fingerprint))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS reports_last_used ON reports (last_used)")
+        self.connection.commit()
+
+    def get(self, repo_url, sha) -> Optional[FindingsTable]:
+        key = (normalize_repo_url(repo_url), sha, self.fingerprint)
+        row = self.connection.execute(
+            "SELECT payload FROM reports WHERE repo_url = ? AND sha = ? AND fingerprint = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute(
+            "UPDATE reports SET last_used = ? WHERE repo_url = ? AND sha = ? AND fingerprint = ?", (time.time(),) + key
+        )
+        self.connection.commit()
+        return deserialize_findings(row[0])
+
+    def put(self, repo_url, sha, table: FindingsTable):
+        payload = serialize_findings(table)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)",
+            (normalize_repo_url(repo_url), sha, self.fingerprint, payload, len(payload), time.time()),
+        )
+        self.connection.commit()
+        self.evict()
+
+    def evict(self):
+        # drop least recently used reports until the cache fits in max_bytes
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM reports").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        stale = []
+        for rowid, size in self.connection.execute("SELECT rowid, size FROM reports ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            stale.append((rowid,))
+            total -= size
+        self.connection.executemany("DELETE FROM reports WHERE rowid = ?", stale)
+        self.connection.commit()
+        return len(stale)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
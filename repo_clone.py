@@ -0,0 +1,70 @@
+import os
+import shutil
+import subprocess
+
+# only Python files of the tip are ever read
+SPARSE_PATTERNS = ["*.py"]
+
+# repositories cloned at the same time by repo_pipeline
+MAX_CONCURRENT_CLONES = 4
+
+# clone strategies, cheapest first
+SPARSE = "sparse"
+SHALLOW = "shallow"
+FULL = "full"
+
+
+def _git(args, cwd=None):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True,
+                   env={**os.environ, "GIT_TERMINAL_PROMPT": "0"})
+
+
+def clone_sparse(repo_url, target):
+    # Last commit only, no file contents up front (partial clone), then a checkout
+    # limited to *.py that fetches just those blobs. A server without partial clone
+    # support makes git print a warning and send every blob of the commit, which
+    # still works; a git without non-cone sparse checkout gets the whole tree.
+    _git(["clone", "--depth", "1", "--filter=blob:none", "--no-checkout", "--", repo_url, target])
+    try:
+        _git(["sparse-checkout", "set", "--no-cone", *SPARSE_PATTERNS], cwd=target)
+    except subprocess.CalledProcessError:
+        pass
+    _git(["checkout"], cwd=target)
+
+
+def clone_shallow(repo_url, target):
+    _git(["clone", "--depth", "1", "--", repo_url, target])
+
+
+def clone_full(repo_url, target):
+    _git(["clone", "--", repo_url, target])
+
+
+CLONE_STRATEGIES = {
+    SPARSE: clone_sparse,
+    SHALLOW: clone_shallow,
+    FULL: clone_full,
+}
+
+
+def _empty_folder(folder):
+    for entry in os.scandir(folder):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+
+
+def clone_repository(repo_url, target, strategies=tuple(CLONE_STRATEGIES)):
+    # tries each strategy in turn (e.g. dumb HTTP servers cannot do shallow clones)
+    # and returns the name of the one that worked; target must be an empty folder
+    error = None
+    for strategy in strategies:
+        try:
+            CLONE_STRATEGIES[strategy](repo_url, target)
+            return strategy
+        except subprocess.CalledProcessError as e:
+            error = e
+            if os.path.isdir(target):
+                _empty_folder(target)
+    raise error
@@ -0,0 +1,128 @@
+import asyncio
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from detectors.registry import indexed_detectors
+from executor import analyze_files
+from pipeline import index_file
+from project_index import ProjectIndex, resolve_results
+from project_reader import ProjectReader
+from repo_clone import MAX_CONCURRENT_CLONES, clone_repository
+
+# results waiting for the event loop, the analysis thread blocks beyond this
+RESULT_QUEUE_SIZE = 256
+
+_DONE = object()
+
+
+class RepoRun:
+    def __init__(self, repo_url, folder):
+        self.repo_url = repo_url
+        self.folder = folder
+        self.strategy = None
+        self.repo_age_days = None
+        self.files = 0
+        self.analyzed = 0
+        self.error = None
+        # project_index.ProjectIndex of the analyzed files, when the selection has indexed
+        # detectors; its corrections() complete the reports once every result is in
+        self.index = None
+
+
+async def stream_analysis(file_paths, jobs=None, cache_path=None, profile=False, executor=None, detectors=None,
+                          index=None):
+    # executor.analyze_files driven from a thread, its FileResults handed to the event
+    # loop one by one as they arrive; the bounded queue keeps the thread from running
+    # far ahead of a slow consumer. With a project_index.ProjectIndex, results go
+    # through resolve_results on the thread.
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(RESULT_QUEUE_SIZE)
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            results = analyze_files(file_paths, jobs, cache_path, profile, detectors)
+            if index is not None:
+                results = resolve_results(results, index)
+            for result in results:
+                if stopped.is_set():
+                    break
+                asyncio.run_coroutine_threadsafe(queue.put(result), loop).result()
+        except BaseException as e:
+            asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+        else:
+            asyncio.run_coroutine_threadsafe(queue.put(_DONE), loop).result()
+
+    producer = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # the consumer left early: let a blocked put finish so the thread can stop
+        stopped.set()
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+
+async def analyze_repository(run: RepoRun, on_result, jobs=None, cache_path=None, profile=False,
+                             clone_slots=None, analysis_lock=None, fetch_metadata=None, executor=None, detectors=None):
+    # The metadata request runs while the repository is cloned; analysis starts as soon
+    # as the working tree is there, without waiting for it. on_result(run, FileResult)
+    # is called on the event loop for every file. Clone errors propagate
+    # (subprocess.CalledProcessError) after the metadata request finished. Blocking
+    # work runs on executor (the loop's default one if None), which needs a thread
+    # for the clone, the metadata request and the analysis.
+    if fetch_metadata is None:
+        # requests is only needed when the metadata really comes from GitHub
+        from github_utils import get_repo_last_update as fetch_metadata
+    loop = asyncio.get_running_loop()
+    metadata = None
+    try:
+        async with clone_slots or contextlib.nullcontext():
+            metadata = loop.run_in_executor(executor, fetch_metadata, run.repo_url)
+            run.strategy = await loop.run_in_executor(executor, clone_repository, run.repo_url, run.folder)
+        file_paths = ProjectReader(run.folder).list_files()
+        run.files = len(file_paths)
+        run.index = None
+        if indexed_detectors(detectors):
+            run.index = ProjectIndex(run.folder, lambda path: index_file(path, detectors))
+        async with analysis_lock or contextlib.nullcontext():
+            async with contextlib.aclosing(
+                    stream_analysis(file_paths, jobs, cache_path, profile, executor, detectors, run.index)) as results:
+                async for result in results:
+                    run.analyzed += 1
+                    on_result(run, result)
+    finally:
+        if metadata is not None:
+            run.repo_age_days = await metadata
+    return run
+
+
+async def analyze_repositories(runs, on_result, max_clones=MAX_CONCURRENT_CLONES, jobs=None, cache_path=None,
+                               profile=False, fetch_metadata=None, detectors=None):
+    # At most max_clones clones at a time, each into its RepoRun.folder (an empty
+    # folder). Analyses take turns so every one gets the whole worker pool, while later
+    # repositories keep cloning. A repository that fails gets RepoRun.error, the others
+    # go on. Metadata requests start with their clone, so max_clones bounds them too.
+    clone_slots = asyncio.Semaphore(max_clones)
+    analysis_lock = asyncio.Lock()
+
+    # a clone and a metadata request per slot, plus the one running analysis
+    with ThreadPoolExecutor(max_workers=2 * max_clones + 1) as executor:
+        async def analyze(run):
+            try:
+                await analyze_repository(run, on_result, jobs, cache_path, profile, clone_slots, analysis_lock,
+                                         fetch_metadata, executor, detectors)
+            except Exception as e:
+                run.error = e
+
+        await asyncio.gather(*(analyze(run) for run in runs))
+    return runs
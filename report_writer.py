@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+import time
+
+from model.report import Report
+
+REPORT_HEADER = ["File ", "Heuristic detected", "Details", "Line", "Is code smell?", "Category"]
+FLUSH_INTERVAL = 2.0
+
+
+def report_rows(file_path, report: Report):
+    return [(file_path, h.name, h.details, h.line_nr, h.is_code_smell, h.category) for h in report.heuristics]
+
+
+def heuristic_records(heuristics):
+    return [
+        {"name": h.name, "details": h.details, "line_nr": h.line_nr, "is_code_smell": h.is_code_smell,
+         "category": h.category.name if h.category is not None else None}
+        for h in heuristics
+    ]
+
+
+class ReportWriter:
+    # Streams report.csv and report.jsonl (one line per analyzed file) while the run goes
+    # on, flushing every FLUSH_INTERVAL seconds, so a crash keeps what was already found.
+    # Only filename -> JSONL offset is kept in memory for get_file_report.
+    # With merge (a --base run) the previous report.jsonl is kept and this run's records
+    # go to a file of their own until merge() combines the two.
+    def __init__(self, project_folder_output, write_csv=True, flush_interval=FLUSH_INTERVAL, merge=False):
+        self.folder = os.path.join("./results", project_folder_output)
+        os.makedirs(self.folder, exist_ok=True)
+        self.csv_path = os.path.join(self.folder, "report.csv")
+        self.jsonl_path = os.path.join(self.folder, "report.jsonl")
+        self.flush_interval = flush_interval
+        self.index = {}
+        self.rows_written = 0
+        self._last_flush = time.monotonic()
+
+        self.csv_file = None
+        if write_csv:
+            # a path that is not UTF-8 comes as surrogates (like os.scandir gives it) and
+            # is written back as its own bytes, merge_report_csv reads it the same way
+            self.csv_file = open(self.csv_path, mode='w', newline='', encoding='utf-8', errors='surrogateescape')
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(REPORT_HEADER)
+        # the file lookup() reads, report.jsonl itself unless merging
+        self.records_path = self.jsonl_path + ".new" if merge else self.jsonl_path
+        # binary, so tell() gives byte offsets usable for seek() when reading back
+        self.jsonl_file = open(self.records_path, mode='wb')
+
+    def write(self, file_path, report: Report):
+        rows = report_rows(file_path, report)
+        if self.csv_file is not None:
+            self.csv_writer.writerows(rows)
+        self.rows_written += len(rows)
+
+        offset = self.jsonl_file.tell()
+        self.jsonl_file.write(json.dumps({
+            "file": file_path,
+            "filename": report.filename,
+            "heuristics": heuristic_records(report.heuristics),
+        }).encode("utf-8") + b"\n")
+        # like the in-memory lookup it replaces, the first file with that name wins
+        self.index.setdefault(report.filename, offset)
+
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.flush()
+            self._last_flush = now
+        return rows
+
+    def flush(self):
+        if self.csv_file is not None:
+            self.csv_file.flush()
+        self.jsonl_file.flush()
+
+    def lookup(self, filename):
+        offset = self.index.get(filename)
+        if offset is None:
+            return None
+        if not self.jsonl_file.closed:
+            self.jsonl_file.flush()
+        with open(self.records_path, mode='rb') as jsonl_file:
+            jsonl_file.seek(offset)
+            return json.loads(jsonl_file.readline())["heuristics"]
+
+    def merge(self, replaced_files):
+        # report.jsonl after a merging run: the previous records of files not in
+        # replaced_files (re-analyzed, deleted or renamed), then this run's records; the
+        # lookup offsets are rebuilt for the merged file
+        self.close()
+        replaced_files = set(replaced_files)
+        self.index = {}
+        merged_path = self.jsonl_path + ".merged"
+        with open(merged_path, mode='wb') as merged:
+            if os.path.isfile(self.jsonl_path):
+                with open(self.jsonl_path, mode='rb') as previous:
+                    self._copy_records(previous, merged, replaced_files)
+            with open(self.records_path, mode='rb') as records:
+                self._copy_records(records, merged)
+        os.replace(merged_path, self.jsonl_path)
+        if self.records_path != self.jsonl_path:
+            os.remove(self.records_path)
+            self.records_path = self.jsonl_path
+
+    def _copy_records(self, source, target, skipped_files=()):
+        for line in source:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # a line cut short by a crash
+                continue
+            if record["file"] in skipped_files:
+                continue
+            self.index.setdefault(record["filename"], target.tell())
+            target.write(line)
+
+    def correct(self, corrections):
+        # Once the writer is closed (and merged): corrections maps a file path to
+        # (findings, heuristics), the rows of that file without a line whose (name,
+        # details) is in findings are replaced by heuristics, placed after the file's
+        # other rows (in a record of its own for a file the report does not have yet).
+        # report.csv, if there is one, and report.jsonl are rewritten a line at a time.
+        # Returns the change in (rows, code smells).
+        if not corrections:
+            return 0, 0
+        if os.path.isfile(self.csv_path):
+            self._correct_csv(corrections)
+        return self._correct_records(corrections)
+
+    def _correct_csv(self, corrections):
+        corrected_path = self.csv_path + ".corrected"
+        with open(self.csv_path, newline='', encoding='utf-8', errors='surrogateescape') as source, \
+                open(corrected_path, mode='w', newline='', encoding='utf-8', errors='surrogateescape') as target:
+            reader, writer = csv.reader(source), csv.writer(target)
+            writer.writerow(next(reader, REPORT_HEADER))
+            pending = dict(corrections)
+            current = None
+            for row in reader:
+                if row[0] != current:
+                    # rows of a file are contiguous, the corrected ones go at the end of its block
+                    self._write_corrected_rows(writer, current, pending)
+                    current = row[0]
+                if current in corrections and row[3] == "" and (row[1], row[2]) in corrections[current][0]:
+                    continue
+                writer.writerow(row)
+            self._write_corrected_rows(writer, current, pending)
+            for file_path in list(pending):
+                self._write_corrected_rows(writer, file_path, pending)
+        os.replace(corrected_path, self.csv_path)
+
+    @staticmethod
+    def _write_corrected_rows(writer, file_path, pending):
+        correction = pending.pop(file_path, None)
+        if correction is not None:
+            writer.writerows(report_rows(file_path, Report(os.path.basename(file_path), correction[1])))
+
+    def _correct_records(self, corrections):
+        rows = code_smells = 0
+        pending = dict(corrections)
+        self.index = {}
+        corrected_path = self.records_path + ".corrected"
+        with open(self.records_path, mode='rb') as source, open(corrected_path, mode='wb') as target:
+            for line in source:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a line cut short by a crash
+                    continue
+                correction = pending.pop(record["file"], None)
+                if correction is not None:
+                    findings, heuristics = correction
+                    kept = [h for h in record["heuristics"]
+                            if h["line_nr"] is not None or (h["name"], h["details"]) not in findings]
+                    removed = [h for h in record["heuristics"] if h not in kept]
+                    rows += len(heuristics) - len(removed)
+                    code_smells += (sum(bool(h.is_code_smell) for h in heuristics)
+                                    - sum(bool(h["is_code_smell"]) for h in removed))
+                    record["heuristics"] = kept + heuristic_records(heuristics)
+                    line = json.dumps(record).encode("utf-8") + b"\n"
+                self.index.setdefault(record["filename"], target.tell())
+                target.write(line)
+            for file_path, (_, heuristics) in pending.items():
+                if not heuristics:
+                    continue
+                rows += len(heuristics)
+                code_smells += sum(bool(h.is_code_smell) for h in heuristics)
+                filename = os.path.basename(file_path)
+                self.index.setdefault(filename, target.tell())
+                target.write(json.dumps({"file": file_path, "filename": filename,
+                                         "heuristics": heuristic_records(heuristics)}).encode("utf-8") + b"\n")
+        os.replace(corrected_path, self.records_path)
+        return rows, code_smells
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+        self.jsonl_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from functools import lru_cache
+from typing import List, Optional
+
+from model.category import Category
+from model.heuristic import Heuristic
+
+DEFAULT_CACHE_PATH = os.path.join("./results", ".cache", "results.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# modules whose source decides what a file's findings are, on top of the detectors
+FINGERPRINT_MODULES = ["analyzer", "pre_processing", "traversal", "pipeline", "model.heuristic", "model.category",
+                       "detectors.registry", "detectors.name_resolver", "detectors.pattern_set", "project_index"]
+
+
+@lru_cache(maxsize=None)
+def detector_fingerprint(detectors=None):
+    # any edit to a detector (or the code driving them) invalidates older entries, and
+    # a run limited to some detectors (see detectors.registry) has entries of its own
+    from detectors.registry import detector_specs
+
+    modules = set(FINGERPRINT_MODULES)
+    modules.update(spec.module for spec in detector_specs(detectors))
+    digest = hashlib.sha256()
+    digest.update(repr(detectors).encode())
+    for module_name in sorted(modules):
+        __import__(module_name)
+        with open(sys.modules[module_name].__file__, "rb") as source:
+            digest.update(module_name.encode())
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def content_hash(data: bytes):
+    return hashlib.sha256(data).hexdigest()
+
+
+def heuristic_rows(heuristics: Optional[List[Heuristic]]):
+    if heuristics is None:
+        return None
+    return [
+        [h.name, h.details, h.line_nr, h.is_code_smell, h.category.name if h.category is not None else None]
+        for h in heuristics
+    ]
+
+
+def heuristics_from_rows(rows) -> Optional[List[Heuristic]]:
+    if rows is None:
+        return None
+    return [
+        Heuristic(name, details, line_nr, is_code_smell, Category[category] if category is not None else None)
+        for name, details, line_nr, is_code_smell, category in rows
+    ]
+
+
+def serialize_payload(heuristics: Optional[List[Heuristic]], symbols=None):
+    # symbols: the file's project_index.ModuleSymbols, if it was indexed
+    return json.dumps({"heuristics": heuristic_rows(heuristics),
+                       "symbols": symbols.to_json() if symbols is not None else None})
+
+
+def deserialize_payload(payload):
+    data = json.loads(payload)
+    return heuristics_from_rows(data["heuristics"]), data["symbols"]
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, detectors=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fingerprint = detector_fingerprint(detectors)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # several worker processes share the file, WAL lets readers run beside one writer;
+        # autocommit keeps every write its own short transaction, so no worker holds the
+        # write lock while it analyzes, and synchronous=NORMAL skips the fsync per commit
+        # (a crash can lose the last entries, never corrupt the file)
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " content_hash TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (content_hash, fingerprint))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def get(self, key):
+        # returns (hit, heuristics, symbols); heuristics is None for files that are not RL
+        # scripts, symbols the JSON of their ModuleSymbols (None when not indexed)
+        row = self.connection.execute(
+            "SELECT payload FROM results WHERE content_hash = ? AND fingerprint = ?",
+            (key, self.fingerprint),
+        ).fetchone()
+        if row is None:
+            return False, None, None
+        self.connection.execute(
+            "UPDATE results SET last_used = ? WHERE content_hash = ? AND fingerprint = ?",
+            (time.time(), key, self.fingerprint),
+        )
+        return (True,) + deserialize_payload(row[0])
+
+    def put(self, key, heuristics: Optional[List[Heuristic]], symbols=None):
+        payload = serialize_payload(heuristics, symbols)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (key, self.fingerprint, payload, len(payload), time.time()),
+        )
+
+    def evict(self):
+        # drop least recently used entries until the cache fits in max_bytes
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        rows = self.connection.execute("SELECT rowid, size FROM results ORDER BY last_used").fetchall()
+        stale = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((rowid,))
+            total -= size
+            evicted += 1
+        # one transaction, not one per deleted row
+        self.connection.execute("BEGIN")
+        self.connection.executemany("DELETE FROM results WHERE rowid = ?", stale)
+        self.connection.execute("COMMIT")
+        return evicted
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,109 @@
+import ast
+from collections import defaultdict
+
+
+def build_dispatch_table(detectors):
+    # node type -> bound visit_* handlers of every detector that cares about it
+    table = defaultdict(list)
+    for detector in detectors:
+        for attr in dir(type(detector)):
+            if not attr.startswith("visit_"):
+                continue
+            node_type = getattr(ast, attr[len("visit_"):], None)
+            if not isinstance(node_type, type) or not issubclass(node_type, ast.AST):
+                continue
+            # skip the helpers ast.NodeVisitor defines itself (e.g. visit_Constant)
+            if getattr(type(detector), attr) is getattr(ast.NodeVisitor, attr, None):
+                continue
+            table[node_type].append(getattr(detector, attr))
+    return dict(table)
+
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+SCOPE_NODES = frozenset(FUNCTION_NODES + LOOP_NODES + (ast.ClassDef,))
+
+# pushed after a scope node's children, popping it means the walk left the scope
+_LEAVE_SCOPE = object()
+
+
+class ScopeStack:
+    # Enclosing functions, classes and loops of the node being visited. Everything a
+    # detector can ask is answered in O(1), without re-walking the enclosing function.
+    # A scope node's own handlers run before it is entered, its children after.
+    def __init__(self):
+        self.scopes = []
+        self.functions = []
+        self.classes = []
+        self.loop_depth = 0
+        self._functions_by_name = {}
+
+    def enter(self, node):
+        self.scopes.append(node)
+        if isinstance(node, FUNCTION_NODES):
+            self.functions.append(node)
+            self._functions_by_name.setdefault(node.name, []).append(node)
+        elif isinstance(node, ast.ClassDef):
+            self.classes.append(node)
+        else:
+            self.loop_depth += 1
+
+    def leave(self):
+        node = self.scopes.pop()
+        if isinstance(node, FUNCTION_NODES):
+            self.functions.pop()
+            same_name = self._functions_by_name[node.name]
+            same_name.pop()
+            if not same_name:
+                del self._functions_by_name[node.name]
+        elif isinstance(node, ast.ClassDef):
+            self.classes.pop()
+        else:
+            self.loop_depth -= 1
+
+    @property
+    def in_loop(self):
+        return self.loop_depth > 0
+
+    @property
+    def current_function(self):
+        return self.functions[-1] if self.functions else None
+
+    @property
+    def current_class(self):
+        return self.classes[-1] if self.classes else None
+
+    def enclosing_function(self, name):
+        # innermost enclosing function (or method, or nested function) called name
+        same_name = self._functions_by_name.get(name)
+        return same_name[-1] if same_name else None
+
+
+class TraversalEngine:
+    def __init__(self, detectors, scope=None):
+        self.detectors = detectors
+        self.dispatch = build_dispatch_table(detectors)
+        self.scope = scope if scope is not None else ScopeStack()
+        self.nodes_visited = 0
+
+    def run(self, tree):
+        # pre-order walk, each node is visited exactly once and handed to all
+        # interested detectors; detectors must not recurse on their own
+        dispatch = self.dispatch
+        scope = self.scope
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if node is _LEAVE_SCOPE:
+                scope.leave()
+                continue
+            self.nodes_visited += 1
+            handlers = dispatch.get(type(node))
+            if handlers:
+                for handler in handlers:
+                    handler(node)
+            if type(node) in SCOPE_NODES:
+                scope.enter(node)
+                stack.append(_LEAVE_SCOPE)
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
+        return self.nodes_visited
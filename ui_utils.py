@@ -1,20 +1,91 @@
 from typing import List
 
+import numpy as np
 import pandas as pd
+from model.findings_table import CATEGORIES, NO_LINE, FindingsTable
 from model.report import Report
 
+# the "Category" column shows "" for findings without a category
+CATEGORY_NAMES = ["" if category is None else category.name for category in CATEGORIES]
+# rows sent to the browser per results page
+PAGE_SIZE = 500
+CATEGORY_DETAIL_COLUMNS = ["File", "Smell", "Details", "Line"]
+
+
+def _column(values):
+    # zero-copy numpy view of an array.array column
+    return np.frombuffer(values, dtype=values.typecode)
+
+
+def findings_to_dataframe(table: FindingsTable) -> pd.DataFrame:
+    lines = _column(table.lines)
+    return pd.DataFrame({
+        "File": pd.Categorical.from_codes(_column(table.file_codes), categories=table.files.values),
+        "Smell": pd.Categorical.from_codes(_column(table.smell_codes), categories=table.smells.values),
+        "Details": pd.Categorical.from_codes(_column(table.details_codes), categories=table.details.values),
+        "Line": pd.arrays.IntegerArray(lines.copy(), lines == NO_LINE),
+        "Category": pd.Categorical.from_codes(_column(table.category_codes), categories=CATEGORY_NAMES),
+        "Is Code Smell": _column(table.code_smell_flags).astype(bool),
+    })
+
 
 def reports_to_dataframe(reports: List[Report]) -> pd.DataFrame:
-    rows = []
-    for report in reports:
-        for h in report.heuristics:
-            rows.append({
-                "File": report.filename,
-                "Smell": h.name,
-                "Details": h.details,
-                "Line": h.line_nr,
-                "Category": h.category.name if h.category is not None else "",
-                "Is Code Smell": h.is_code_smell,
-            })
-    return pd.DataFrame(rows)
+    return findings_to_dataframe(FindingsTable.from_reports(reports))
+
+
+def page_count(total_rows, page_size=PAGE_SIZE):
+    return max(1, -(-total_rows // page_size))
+
+
+class ResultsView:
+    # Everything the results page shows, computed once per analysis: category counts
+    # and percentages, the rows of every category's code smells, both CSV downloads.
+    # Chart clicks and page changes rerun the app, which then only looks up and slices.
+    def __init__(self, df: pd.DataFrame, repo_url, repo_age_days):
+        self.df = df
+        self.report_csv = df.to_csv(index=False).encode("utf-8")
+
+        # code smell rows grouped by category code in one stable sort, row order kept
+        smell_rows = np.flatnonzero(df["Is Code Smell"].to_numpy())
+        category_codes = df["Category"].cat.codes.to_numpy()[smell_rows]
+        grouped_rows = smell_rows[np.argsort(category_codes, kind="stable")]
+        counts = np.bincount(category_codes, minlength=len(df["Category"].cat.categories))
+        self.rows_by_category = {}
+        start = 0
+        for name, count in zip(df["Category"].cat.categories, counts):
+            if count:
+                self.rows_by_category[name] = grouped_rows[start:start + count]
+            start += count
+
+        # most frequent category first, like value_counts
+        ordered = sorted(self.rows_by_category, key=lambda name: -len(self.rows_by_category[name]))
+        total_smells = len(smell_rows)
+        self.category_counts = pd.DataFrame({
+            "Category": ordered,
+            "Count": [len(self.rows_by_category[name]) for name in ordered],
+        })
+        self.category_counts["Percentage"] = (self.category_counts["Count"] / max(total_smells, 1) * 100).round(2)
+
+        self.category_table = pd.DataFrame({
+            "Code Smell Category": self.category_counts["Category"],
+            "Nr of Occurrences": self.category_counts["Count"].astype(str),
+            "Percentage": self.category_counts["Percentage"].astype(str) + " %",
+        })
+
+        category_csv_data = self.category_counts.copy()
+        category_csv_data.insert(0, "Repository Age (days)", repo_age_days if repo_age_days is not None else "N/A")
+        category_csv_data.insert(0, "Repository", repo_url)
+        self.category_csv = category_csv_data.to_csv(index=False).encode("utf-8")
+
+    def category_size(self, category):
+        rows = self.rows_by_category.get(category)
+        return 0 if rows is None else len(rows)
+
+    def page(self, page, page_size=PAGE_SIZE) -> pd.DataFrame:
+        start = page * page_size
+        return self.df.iloc[start:start + page_size]
 
+    def category_page(self, category, page, page_size=PAGE_SIZE) -> pd.DataFrame:
+        start = page * page_size
+        rows = self.rows_by_category.get(category, np.empty(0, dtype=np.intp))[start:start + page_size]
+        return self.df.iloc[rows][CATEGORY_DETAIL_COLUMNS]